@@ -126,16 +126,20 @@ async def confirm_upload(
     arq_pool = getattr(request.app.state, "arq_pool", None)
     if arq_pool is not None:
         try:
+            # _job_id dedupes repeated confirmations at the Redis layer
             await arq_pool.enqueue_job(
                 "transcribe_conversation",
                 conversation_id=str(conversation_id),
+                _job_id=f"transcribe:{conversation_id}",
             )
             logger.info(
                 "Enqueued transcription job for conversation %s",
                 conversation_id,
             )
         except Exception as exc:
-            # Log but don't fail the request -- transcription can be retried
+            # Log but don't fail the request -- the worker's
+            # requeue_stuck_uploads cron picks up conversations left in
+            # 'uploaded'
             logger.error(
                 "Failed to enqueue transcription job for %s: %s",
                 conversation_id,
@@ -35,8 +35,15 @@ class Settings(BaseSettings):
         self.database_url = urlunparse(parsed._replace(query=cleaned_query))
         return self
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+
     # Redis
     redis_url: str = "redis://localhost:6379"
+    redis_max_connections: int = 20
+    # Seconds to wait for a free pooled connection before raising
+    redis_pool_timeout: float = 10.0
 
     # Tigris Object Storage
     tigris_endpoint: str = "https://fly.storage.tigris.dev"
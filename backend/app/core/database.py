@@ -1,6 +1,7 @@
 from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -8,11 +9,34 @@ from sqlalchemy.ext.asyncio import (
 
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-)
+
+def create_db_engine(
+    pool_size: int = settings.db_pool_size,
+    max_overflow: int = settings.db_max_overflow,
+) -> AsyncEngine:
+    """Create an async engine with an explicitly sized connection pool.
+
+    Used for the API's module-level engine and by the ARQ worker, so both
+    processes share one pool configuration.
+
+    Args:
+        pool_size: Number of connections kept open in the pool.
+        max_overflow: Extra connections allowed beyond pool_size.
+
+    Returns:
+        A configured AsyncEngine.
+    """
+    return create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+
+
+engine = create_db_engine()
 
 async_session = async_sessionmaker(
     engine,
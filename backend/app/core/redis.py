@@ -0,0 +1,36 @@
+"""ARQ Redis client shared by the API and the worker.
+
+arq's create_pool builds a plain redis-py ConnectionPool, which raises
+ConnectionError("Too many connections") as soon as max_connections are
+checked out. The client built here sits on a BlockingConnectionPool
+instead: at the cap a caller waits up to redis_pool_timeout seconds for a
+connection to be returned, so a load spike queues rather than failing jobs
+and enqueues.
+"""
+
+from arq.connections import ArqRedis
+from redis.asyncio import BlockingConnectionPool
+
+from app.core import serialization
+from app.core.config import settings
+
+
+def create_arq_redis() -> ArqRedis:
+    """Create an ArqRedis client on a bounded, blocking connection pool.
+
+    Connections are opened lazily, so the client can be created before an
+    event loop is running (the worker settings do so at import).
+
+    Returns:
+        ArqRedis using the msgpack job serializers.
+    """
+    pool = BlockingConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+    )
+    return ArqRedis(
+        pool,
+        job_serializer=serialization.job_serializer,
+        job_deserializer=serialization.job_deserializer,
+    )
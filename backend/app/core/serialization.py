@@ -0,0 +1,52 @@
+"""Fast JSON encoding and decoding helpers.
+
+Uses orjson when it is installed and falls back to the standard library
+json module otherwise. Both paths accept str or bytes input and raise
+json.JSONDecodeError (orjson's error type subclasses it) on bad input.
+
+Also provides the msgpack serializers used for ARQ job payloads. The API
+(which enqueues jobs) and the worker (which runs them) must both use them.
+"""
+
+import json
+import pickle
+from typing import Any
+
+import msgspec
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+
+
+def dumps(value: Any) -> str:
+    """Serialize value to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    """Deserialize a JSON document from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def job_serializer(value: Any) -> bytes:
+    """Serialize an ARQ job or result payload to msgpack."""
+    return msgspec.msgpack.encode(value)
+
+
+def job_deserializer(data: bytes) -> Any:
+    """Deserialize an ARQ job or result payload from msgpack.
+
+    Falls back to pickle, ARQ's default serializer, for jobs that were
+    queued or deferred before the switch to msgpack. The fallback is kept
+    for one release, until no pickle payloads can remain in Redis.
+    """
+    try:
+        return msgspec.msgpack.decode(data)
+    except msgspec.DecodeError:
+        return pickle.loads(data)
@@ -4,12 +4,18 @@ Generates a casual friend-recap summary and topic labels from a conversation
 transcript using xAI Grok via the OpenAI-compatible API.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
-from dataclasses import dataclass, field
+from collections import OrderedDict
 
+import httpx
+import msgspec
 from openai import AsyncOpenAI
 
+from app.core import serialization
+
 logger = logging.getLogger(__name__)
 
 SUMMARIZATION_SYSTEM_PROMPT = (
@@ -25,12 +31,28 @@ SUMMARIZATION_SYSTEM_PROMPT = (
     "Respond ONLY with valid JSON. No extra text."
 )
 
+# Shared system message: kept first and byte-identical across calls so the
+# provider can reuse its cached prompt prefix.
+_SYSTEM_MESSAGE = {"role": "system", "content": SUMMARIZATION_SYSTEM_PROMPT}
+
+# Summary text returned when the LLM response cannot be parsed
+SUMMARY_FAILED_TEXT = "Summary generation failed"
+
 # Minimum word count for a meaningful transcript
 _MIN_WORD_COUNT = 10
 
+# Transcripts longer than this are summarized map-reduce style: chunks are
+# summarized concurrently, then the chunk summaries are summarized.
+_MAP_REDUCE_MIN_WORDS = 4000
+_CHUNK_WORDS = 1000
+_CHUNK_OVERLAP_WORDS = 100
+_MAX_CONCURRENT_CHUNKS = 5
 
-@dataclass
-class SummaryResult:
+# Number of transcript digests remembered by the per-service result cache
+_CACHE_MAX_ENTRIES = 256
+
+
+class SummaryResult(msgspec.Struct, frozen=True, gc=False):
     """Result of a summarization operation.
 
     Attributes:
@@ -40,10 +62,23 @@ class SummaryResult:
     """
 
     summary: str = ""
-    key_topics: list[str] = field(default_factory=list)
+    key_topics: list[str] = msgspec.field(default_factory=list)
     provider: str = ""
 
 
+# Returned (as a copy) for transcripts too short to summarize
+_SHORT_DEFAULT = SummaryResult(
+    summary="Brief or empty conversation",
+    key_topics=[],
+    provider="grok",
+)
+
+
+def _copy_result(result: SummaryResult) -> SummaryResult:
+    """Return a copy of result that does not share its key_topics list."""
+    return msgspec.structs.replace(result, key_topics=list(result.key_topics))
+
+
 class SummarizationService:
     """Generates conversation summaries using xAI Grok.
 
@@ -52,14 +87,40 @@ class SummarizationService:
         result = await service.summarize(transcript_text)
     """
 
-    def __init__(self, xai_api_key: str) -> None:
+    def __init__(
+        self,
+        xai_api_key: str,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self._xai_key = xai_api_key
+        # One client per service so its connection pool (and TLS sessions
+        # to api.x.ai) is reused across summarize() calls. A shared
+        # http_client is left open on aclose() for its owner to close.
+        self._owns_http_client = http_client is None
+        self._client = AsyncOpenAI(
+            api_key=xai_api_key,
+            base_url="https://api.x.ai/v1",
+            max_retries=2,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            http_client=http_client,
+        )
+        # SHA-256 of transcript -> result, so job retries that re-submit
+        # the same transcript skip the LLM call.
+        self._cache: OrderedDict[bytes, SummaryResult] = OrderedDict()
+        self._chunk_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_CHUNKS)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client unless it is shared."""
+        if self._owns_http_client:
+            await self._client.close()
 
     async def summarize(self, transcript_text: str) -> SummaryResult:
         """Summarize a conversation transcript.
 
         If the transcript is empty or very short (fewer than 10 words),
-        returns a default result without calling the LLM.
+        returns a default result without calling the LLM. Results for
+        transcripts already summarized by this service are served from
+        an in-process LRU cache.
 
         Args:
             transcript_text: Plain text transcript of the conversation.
@@ -68,27 +129,106 @@ class SummarizationService:
             SummaryResult with summary text and key topics.
         """
         # Handle empty or very short transcripts
-        if not transcript_text or len(transcript_text.split()) < _MIN_WORD_COUNT:
+        words = transcript_text.split() if transcript_text else []
+        if len(words) < _MIN_WORD_COUNT:
             logger.info(
                 "Transcript too short for summarization (%d words), using default",
-                len(transcript_text.split()) if transcript_text else 0,
+                len(words),
+            )
+            return _copy_result(_SHORT_DEFAULT)
+
+        digest = hashlib.sha256(transcript_text.encode()).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            logger.info("Summary cache hit, skipping LLM call")
+            return _copy_result(cached)
+
+        if len(words) > _MAP_REDUCE_MIN_WORDS:
+            result = await self._summarize_long(words)
+        else:
+            result = await self._request_summary(
+                f"Transcript:\n{transcript_text}"
             )
+
+        if result is None:
             return SummaryResult(
-                summary="Brief or empty conversation",
+                summary=SUMMARY_FAILED_TEXT,
                 key_topics=[],
                 provider="grok",
             )
 
-        client = AsyncOpenAI(
-            api_key=self._xai_key,
-            base_url="https://api.x.ai/v1",
+        logger.info(
+            "Summarization complete: %d chars summary, %d topics",
+            len(result.summary),
+            len(result.key_topics),
         )
 
-        response = await client.chat.completions.create(
+        self._cache[digest] = _copy_result(result)
+        if len(self._cache) > _CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+        return result
+
+    async def _summarize_long(self, words: list[str]) -> SummaryResult | None:
+        """Summarize a long transcript by summarizing overlapping chunks.
+
+        Each chunk of _CHUNK_WORDS words (overlapping by
+        _CHUNK_OVERLAP_WORDS) is summarized concurrently, then the
+        partial summaries are combined in a final LLM call.
+
+        Args:
+            words: The transcript split into words.
+
+        Returns:
+            SummaryResult for the whole transcript, or None if no chunk
+            or the final call produced a parseable response.
+        """
+        step = _CHUNK_WORDS - _CHUNK_OVERLAP_WORDS
+        chunks = [
+            " ".join(words[i:i + _CHUNK_WORDS])
+            for i in range(0, len(words) - _CHUNK_OVERLAP_WORDS, step)
+        ]
+        logger.info(
+            "Long transcript (%d words), summarizing %d chunks",
+            len(words),
+            len(chunks),
+        )
+
+        async def _summarize_chunk(chunk: str) -> SummaryResult | None:
+            async with self._chunk_semaphore:
+                return await self._request_summary(
+                    f"Transcript excerpt:\n{chunk}"
+                )
+
+        partials = await asyncio.gather(*(_summarize_chunk(c) for c in chunks))
+        lines = [
+            f"Part {i}: {partial.summary} (topics: {', '.join(partial.key_topics)})"
+            for i, partial in enumerate(partials, start=1)
+            if partial is not None
+        ]
+        if not lines:
+            return None
+
+        return await self._request_summary(
+            "Summaries of consecutive parts of one conversation:\n"
+            + "\n".join(lines)
+        )
+
+    async def _request_summary(self, user_content: str) -> SummaryResult | None:
+        """Send one summarization request to Grok and parse the response.
+
+        Args:
+            user_content: The user message (transcript or partial summaries).
+
+        Returns:
+            SummaryResult parsed from the JSON response, or None if the
+            response is not valid JSON.
+        """
+        response = await self._client.chat.completions.create(
             model="grok-4-1-fast-non-reasoning",
             messages=[
-                {"role": "system", "content": SUMMARIZATION_SYSTEM_PROMPT},
-                {"role": "user", "content": f"Transcript:\n{transcript_text}"},
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": user_content},
             ],
             response_format={"type": "json_object"},
             temperature=0.3,
@@ -98,16 +238,12 @@ class SummarizationService:
         raw_content = response.choices[0].message.content or "{}"
 
         try:
-            parsed = json.loads(raw_content)
+            parsed = serialization.loads(raw_content)
         except json.JSONDecodeError:
             logger.error(
                 "Failed to parse LLM response as JSON: %s", raw_content[:200]
             )
-            return SummaryResult(
-                summary="Summary generation failed",
-                key_topics=[],
-                provider="grok",
-            )
+            return None
 
         summary_text = parsed.get("summary", "")
         key_topics = parsed.get("topics", [])
@@ -120,12 +256,6 @@ class SummarizationService:
         key_topics = [str(t) for t in key_topics if t]
         key_topics = key_topics[:3]
 
-        logger.info(
-            "Summarization complete: %d chars summary, %d topics",
-            len(summary_text),
-            len(key_topics),
-        )
-
         return SummaryResult(
             summary=summary_text,
             key_topics=key_topics,
@@ -5,26 +5,48 @@ Uses plain text output format (no verbose JSON or speaker diarization).
 Speaker prediction is handled downstream by the summarization service.
 
 Audio is validated for size (>0, <25MB) and duration (1s-300s) before
-submission. Non-M4A audio is converted to M4A via ffmpeg as a safety net.
+submission. Non-M4A audio is converted to M4A (PyAV, or the ffmpeg CLI as
+a fallback) as a safety net.
 """
 
 import asyncio
+import concurrent.futures
+import io
 import logging
+import os
+import struct
 import subprocess
 import tempfile
-from dataclasses import dataclass, field
 
 import httpx
+import msgspec
 from openai import OpenAI
 
+try:
+    import av
+except ImportError:  # pragma: no cover - av is listed in requirements
+    av = None
+
 logger = logging.getLogger(__name__)
 
 # Maximum file size for OpenAI transcription API (25 MB)
 _OPENAI_MAX_BYTES = 25 * 1024 * 1024
 
+# Threads for blocking work (ffmpeg/ffprobe, PyAV, Whisper SDK calls), kept
+# separate from the event loop's default executor
+_POOL_MAX_WORKERS = 16
+
+# Keep temp audio files for ffprobe/ffmpeg in RAM (tmpfs) when available
+_TMPDIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Byte range fetched before the full download to check size and format
+_PROBE_RANGE = "bytes=0-15"
 
-@dataclass
-class TranscriptionResult:
+# Per-request timeout for audio downloads
+_DOWNLOAD_TIMEOUT = 120.0
+
+
+class TranscriptionResult(msgspec.Struct, frozen=True, gc=False):
     """Result of a transcription operation.
 
     Attributes:
@@ -35,13 +57,95 @@ class TranscriptionResult:
         word_count: Number of words in full_text.
     """
 
-    utterances: list[dict] = field(default_factory=list)
+    utterances: list[dict] = msgspec.field(default_factory=list)
     full_text: str = ""
     provider: str = ""
     language: str = "en"
     word_count: int = 0
 
 
+def _has_ftyp(data: bytes) -> bool:
+    """Return True if data starts with an ISO base media (M4A/MP4) ftyp box."""
+    return len(data) >= 12 and data[4:8] == b"ftyp"
+
+
+def _content_range_total(header: str | None) -> int | None:
+    """Extract the total object size from a Content-Range header.
+
+    Args:
+        header: Header value such as "bytes 0-15/123456", or None.
+
+    Returns:
+        Total size in bytes, or None if absent or unknown ("*").
+    """
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _duration_from_mp4(data: bytes) -> float:
+    """Read audio duration in seconds from an MP4/M4A movie header.
+
+    Walks the top-level ISO BMFF boxes to find ``moov``, then reads
+    ``timescale`` and ``duration`` from its ``mvhd`` child. Avoids
+    spawning ffprobe for files that are already containerized.
+
+    Args:
+        data: Raw MP4/M4A file bytes.
+
+    Returns:
+        Duration in seconds as a float.
+
+    Raises:
+        ValueError: If the moov/mvhd boxes are missing or malformed, or
+            the mvhd duration is unset (0, as in fragmented MP4s) or the
+            all-ones "unknown" value.
+    """
+
+    def _find_box(start: int, end: int, box_type: bytes) -> tuple[int, int]:
+        offset = start
+        while offset + 8 <= end:
+            size, kind = struct.unpack_from(">I4s", data, offset)
+            header = 8
+            if size == 1:
+                if offset + 16 > end:
+                    break
+                (size,) = struct.unpack_from(">Q", data, offset + 8)
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header or offset + size > end:
+                break
+            if kind == box_type:
+                return offset + header, offset + size
+            offset += size
+        raise ValueError(f"MP4 box '{box_type.decode()}' not found")
+
+    moov_start, moov_end = _find_box(0, len(data), b"moov")
+    mvhd_start, mvhd_end = _find_box(moov_start, moov_end, b"mvhd")
+
+    # Full box header (version + flags), then creation/modification times
+    # that are 32-bit in version 0 and 64-bit in version 1.
+    version = data[mvhd_start] if mvhd_start < mvhd_end else -1
+    if version == 1 and mvhd_start + 32 <= mvhd_end:
+        timescale, duration = struct.unpack_from(">IQ", data, mvhd_start + 20)
+        unknown = 0xFFFFFFFFFFFFFFFF
+    elif version == 0 and mvhd_start + 20 <= mvhd_end:
+        timescale, duration = struct.unpack_from(">II", data, mvhd_start + 12)
+        unknown = 0xFFFFFFFF
+    else:
+        raise ValueError(f"Unsupported or truncated mvhd box (version={version})")
+
+    if timescale == 0:
+        raise ValueError("Invalid mvhd timescale (0)")
+    # Fragmented MP4s leave the mvhd duration at 0 (samples live in moof
+    # fragments) and all-ones means "unknown"; neither is a real duration
+    if duration == 0 or duration == unknown:
+        raise ValueError(f"mvhd duration not set ({duration:#x})")
+    return duration / timescale
+
+
 def _get_audio_duration(audio_bytes: bytes) -> float:
     """Determine audio duration in seconds using ffprobe.
 
@@ -57,7 +161,7 @@ def _get_audio_duration(audio_bytes: bytes) -> float:
     Raises:
         ValueError: If ffprobe fails or returns empty output.
     """
-    with tempfile.NamedTemporaryFile(suffix=".m4a", delete=True) as tmp:
+    with tempfile.NamedTemporaryFile(suffix=".m4a", dir=_TMPDIR, delete=True) as tmp:
         tmp.write(audio_bytes)
         tmp.flush()
 
@@ -93,30 +197,54 @@ def _get_audio_duration(audio_bytes: bytes) -> float:
             ) from exc
 
 
-def _ensure_m4a(audio_bytes: bytes) -> bytes:
-    """Ensure audio is in M4A container format, converting if necessary.
-
-    Checks for the ftyp box magic bytes at offset 4-8 which indicate
-    an ISO base media file (M4A/MP4). If not present, converts using
-    ffmpeg with AAC codec at 128kbps.
+def _transcode_with_pyav(audio_bytes: bytes) -> bytes:
+    """Re-encode audio to AAC in an M4A container using in-process libav.
 
     Args:
-        audio_bytes: Raw audio file bytes.
+        audio_bytes: Raw audio file bytes in any format libav can decode.
 
     Returns:
-        Audio bytes in M4A format (original if already M4A, converted otherwise).
+        M4A audio bytes (AAC, 128kbps).
+
+    Raises:
+        av.FFmpegError: If the input cannot be demuxed, decoded or encoded.
+        ValueError: If the input contains no audio stream.
     """
-    # Check for M4A/MP4 ftyp magic bytes at offset 4-8
-    if len(audio_bytes) >= 12 and audio_bytes[4:8] == b"ftyp":
-        return audio_bytes
+    out_buf = io.BytesIO()
+    with av.open(io.BytesIO(audio_bytes)) as in_container:
+        if not in_container.streams.audio:
+            raise ValueError("Input contains no audio stream")
+        in_stream = in_container.streams.audio[0]
+
+        with av.open(out_buf, mode="w", format="mp4") as out_container:
+            out_stream = out_container.add_stream(
+                "aac", rate=in_stream.codec_context.sample_rate or 44100
+            )
+            out_stream.bit_rate = 128_000
 
-    logger.info(
-        "Audio does not have ftyp header, converting to M4A via ffmpeg (%d bytes)",
-        len(audio_bytes),
-    )
+            for frame in in_container.decode(in_stream):
+                frame.pts = None
+                out_container.mux(out_stream.encode(frame))
+            # Flush frames buffered in the encoder
+            out_container.mux(out_stream.encode(None))
+
+    return out_buf.getvalue()
 
-    with tempfile.NamedTemporaryFile(suffix=".audio", delete=True) as infile, \
-         tempfile.NamedTemporaryFile(suffix=".m4a", delete=True) as outfile:
+
+def _transcode_with_ffmpeg(audio_bytes: bytes) -> bytes:
+    """Re-encode audio to AAC in an M4A container via the ffmpeg CLI.
+
+    Args:
+        audio_bytes: Raw audio file bytes.
+
+    Returns:
+        M4A audio bytes (AAC, 128kbps).
+
+    Raises:
+        ValueError: If ffmpeg is missing, times out, or fails.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".audio", dir=_TMPDIR, delete=True) as infile, \
+         tempfile.NamedTemporaryFile(suffix=".m4a", dir=_TMPDIR, delete=True) as outfile:
         infile.write(audio_bytes)
         infile.flush()
 
@@ -137,10 +265,48 @@ def _ensure_m4a(audio_bytes: bytes) -> bytes:
         except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError) as exc:
             raise ValueError(f"ffmpeg conversion to M4A failed: {exc}") from exc
 
-        result = open(outfile.name, "rb").read()
+        with open(outfile.name, "rb") as f:
+            return f.read()
+
+
+def _ensure_m4a(audio_bytes: bytes) -> bytes:
+    """Ensure audio is in M4A container format, converting if necessary.
+
+    Checks for the ftyp box magic bytes at offset 4-8 which indicate
+    an ISO base media file (M4A/MP4). If not present, converts to AAC
+    at 128kbps in-process with PyAV, falling back to the ffmpeg CLI if
+    PyAV is unavailable or cannot handle the input.
+
+    Args:
+        audio_bytes: Raw audio file bytes.
+
+    Returns:
+        Audio bytes in M4A format (original if already M4A, converted otherwise).
+    """
+    # Check for M4A/MP4 ftyp magic bytes at offset 4-8
+    if _has_ftyp(audio_bytes):
+        return audio_bytes
+
+    logger.info(
+        "Audio does not have ftyp header, converting to M4A (%d bytes)",
+        len(audio_bytes),
+    )
+
+    result = None
+    if av is not None:
+        try:
+            result = _transcode_with_pyav(audio_bytes)
+            converter = "pyav"
+        except (av.FFmpegError, ValueError) as exc:
+            logger.warning("PyAV conversion failed, falling back to ffmpeg: %s", exc)
+
+    if result is None:
+        result = _transcode_with_ffmpeg(audio_bytes)
+        converter = "ffmpeg"
 
     logger.info(
-        "Converted non-M4A audio to M4A via ffmpeg (%d -> %d bytes)",
+        "Converted non-M4A audio to M4A via %s (%d -> %d bytes)",
+        converter,
         len(audio_bytes),
         len(result),
     )
@@ -154,10 +320,37 @@ class TranscriptionService:
     Usage:
         service = TranscriptionService(openai_api_key)
         result = await service.transcribe(audio_url)
+        await service.aclose()
     """
 
-    def __init__(self, openai_api_key: str) -> None:
+    def __init__(
+        self,
+        openai_api_key: str,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self._openai_key = openai_api_key
+        # Client used for audio downloads; a shared one is left open on
+        # aclose() for its owner to close.
+        self._owns_http_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient()
+        # Reused across calls to keep the client's connection pool warm
+        self._client = OpenAI(api_key=openai_api_key)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_POOL_MAX_WORKERS,
+            thread_name_prefix="transcribe-io",
+        )
+
+    async def aclose(self) -> None:
+        """Close the HTTP clients and shut down the blocking-work thread pool."""
+        if self._owns_http_client:
+            await self._http_client.aclose()
+        self._client.close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_blocking(self, fn, *args):
+        """Run a blocking callable on the service's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, fn, *args)
 
     async def transcribe(self, audio_url: str) -> TranscriptionResult:
         """Transcribe audio from a presigned URL using Whisper.
@@ -175,11 +368,36 @@ class TranscriptionService:
             ValueError: If audio file is empty, exceeds 25 MB, is too short (<1s),
                 or exceeds 5-minute limit (>300s).
         """
-        # Download audio from presigned URL
-        async with httpx.AsyncClient(timeout=120.0) as http_client:
-            resp = await http_client.get(audio_url)
+        # Probe the first bytes before downloading the body. A ranged GET
+        # (rather than HEAD, which a GET-signed URL rejects) returns the
+        # total size in Content-Range, so oversize or empty uploads are
+        # rejected without transferring them.
+        probe = await self._http_client.get(
+            audio_url,
+            headers={"Range": _PROBE_RANGE},
+            timeout=_DOWNLOAD_TIMEOUT,
+        )
+        if probe.status_code == 416:
+            raise ValueError("Audio file is empty (0 bytes)")
+        probe.raise_for_status()
+
+        if probe.status_code == 206:
+            total = _content_range_total(probe.headers.get("content-range"))
+            if total is not None and total > _OPENAI_MAX_BYTES:
+                raise ValueError(
+                    f"Audio exceeds OpenAI 25MB limit: {total} bytes"
+                )
+            is_m4a = _has_ftyp(probe.content)
+
+            resp = await self._http_client.get(
+                audio_url, timeout=_DOWNLOAD_TIMEOUT
+            )
             resp.raise_for_status()
             audio_bytes = resp.content
+        else:
+            # Server ignored the Range header and sent the whole file
+            audio_bytes = probe.content
+            is_m4a = _has_ftyp(audio_bytes)
 
         # Validate file size
         if len(audio_bytes) == 0:
@@ -190,13 +408,19 @@ class TranscriptionService:
                 f"Audio exceeds OpenAI 25MB limit: {len(audio_bytes)} bytes"
             )
 
-        # Ensure M4A format first (convert via ffmpeg if needed)
+        # Ensure M4A format first (convert via PyAV/ffmpeg if needed)
         # Must run before duration check: raw AAC streams lack duration
         # headers, causing ffprobe to hang scanning the entire stream.
-        audio_bytes = await asyncio.to_thread(_ensure_m4a, audio_bytes)
+        if not is_m4a:
+            audio_bytes = await self._run_blocking(_ensure_m4a, audio_bytes)
 
-        # Validate duration (now on properly containerized M4A)
-        duration = await asyncio.to_thread(_get_audio_duration, audio_bytes)
+        # Validate duration (now on properly containerized M4A). Read it
+        # straight from the mvhd box; fall back to ffprobe if parsing fails.
+        try:
+            duration = _duration_from_mp4(audio_bytes)
+        except ValueError as exc:
+            logger.info("mvhd duration parse failed (%s), using ffprobe", exc)
+            duration = await self._run_blocking(_get_audio_duration, audio_bytes)
         if duration < 1.0:
             raise ValueError(f"Audio too short: {duration:.1f}s (minimum 1s)")
         if duration > 300.0:
@@ -204,16 +428,14 @@ class TranscriptionService:
                 f"Audio exceeds 5-minute limit: {duration:.1f}s"
             )
 
-        client = OpenAI(api_key=self._openai_key)
-
         def _call_whisper() -> object:
-            return client.audio.transcriptions.create(
+            return self._client.audio.transcriptions.create(
                 model="whisper-1",
                 file=("audio.m4a", audio_bytes, "audio/mp4"),
                 response_format="text",
             )
 
-        result = await asyncio.to_thread(_call_whisper)
+        result = await self._run_blocking(_call_whisper)
 
         # Plain text response_format returns a string directly
         full_text = result.strip() if isinstance(result, str) else str(result).strip()
@@ -0,0 +1,61 @@
+"""Per-conversation Redis leases for ARQ tasks.
+
+Two workers can otherwise both pass a task's idempotency check and both
+call the (paid) provider API before either commits. A task holds a lease
+on its conversation for the duration of its body; a second task that
+finds the lease taken skips the conversation.
+"""
+
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Lease lifetime; matches the worker's job_timeout so a crashed worker's
+# lease expires no later than its job would have been cancelled
+_LEASE_TTL_SECONDS = 600
+
+# Delete the key only if it still holds our token, so a lease that expired
+# and was re-acquired by another worker is not released by us
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+@asynccontextmanager
+async def conversation_lease(
+    redis: Redis,
+    task: str,
+    conversation_id: str,
+    ttl: int = _LEASE_TTL_SECONDS,
+) -> AsyncIterator[bool]:
+    """Hold a Redis lease on a conversation for one task.
+
+    Args:
+        redis: Redis client (the ARQ worker pool).
+        task: Task name the lease is scoped to, e.g. "transcribe".
+        conversation_id: UUID string of the conversation.
+        ttl: Lease lifetime in seconds.
+
+    Yields:
+        True if the lease was acquired, False if another worker holds it.
+    """
+    key = f"lock:{task}:{conversation_id}"
+    token = uuid.uuid4().hex
+    acquired = bool(await redis.set(key, token, nx=True, ex=ttl))
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                await redis.eval(_RELEASE_SCRIPT, 1, key, token)
+            except Exception:
+                # The lease still expires on its own after ttl
+                logger.warning("Failed to release lease %s", key, exc_info=True)
@@ -0,0 +1,85 @@
+"""Retry delay helpers shared by ARQ tasks.
+
+Delays use exponential backoff with full jitter so jobs that fail together
+(e.g. during a provider outage) do not retry in lockstep. When a provider
+responds with a Retry-After header, that value is honored instead.
+"""
+
+import math
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+import openai
+
+# Backoff ceiling for the first retry, doubled on each later attempt
+_BACKOFF_BASE_SECONDS = 30
+
+# Upper bound on any retry delay (matches the worker's job_timeout)
+_BACKOFF_CAP_SECONDS = 600
+
+
+def backoff_delay(
+    job_try: int,
+    base: float = _BACKOFF_BASE_SECONDS,
+    cap: float = _BACKOFF_CAP_SECONDS,
+) -> float:
+    """Exponential backoff with full jitter.
+
+    Args:
+        job_try: The attempt that just failed (1 for the first attempt).
+        base: Maximum delay for the first retry, in seconds.
+        cap: Maximum delay for any retry, in seconds.
+
+    Returns:
+        A delay in seconds drawn uniformly from [0, min(cap, base * 2**(job_try - 1))].
+    """
+    return random.uniform(0, min(cap, base * 2 ** (job_try - 1)))
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Extract a Retry-After delay (in seconds) from a provider error.
+
+    Accepts delta-seconds or an HTTP-date. Returns None when the header is
+    missing or unusable (including non-finite numbers such as "nan" or
+    "inf"), so the caller falls back to backoff_delay.
+    """
+    if not isinstance(exc, (openai.APIStatusError, httpx.HTTPStatusError)):
+        return None
+    header = exc.response.headers.get("retry-after")
+    if not header:
+        return None
+    try:
+        seconds = float(header)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(seconds):
+        return None
+    return max(0.0, seconds)
+
+
+def retry_delay(exc: Exception, job_try: int) -> float:
+    """Pick the delay before retrying a job that failed with exc.
+
+    Honors a Retry-After header on provider error responses such as 429
+    (capped at _BACKOFF_CAP_SECONDS), otherwise falls back to
+    backoff_delay.
+
+    Args:
+        exc: The exception that failed the attempt.
+        job_try: The attempt that just failed (1 for the first attempt).
+
+    Returns:
+        Delay in seconds.
+    """
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return min(retry_after, _BACKOFF_CAP_SECONDS)
+    return backoff_delay(job_try)
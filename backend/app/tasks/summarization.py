@@ -1,34 +1,146 @@
-"""ARQ task for summarizing conversation transcripts.
+"""ARQ tasks for summarizing conversation transcripts.
 
 Generates an AI summary and key topics from a conversation transcript
-and stores the result in the summaries table.
+and stores the result in the summaries table. A batch variant summarizes
+many conversations concurrently with a single DB round-trip per phase.
+Newly transcribed conversations are queued on a Redis list that a cron
+job drains into batch jobs.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+from contextlib import AsyncExitStack
 
+import msgspec
 from arq import Retry
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.core.config import settings
+from app.core import serialization
 from app.models.conversation import Conversation, Summary, Transcript
-from app.services.summarization_service import SummarizationService
+from app.services.summarization_service import (
+    SUMMARY_FAILED_TEXT,
+    SummarizationService,
+    SummaryResult,
+)
+from app.tasks.lease import conversation_lease
+from app.tasks.retry import retry_delay
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of in-flight LLM requests for a batch job
+_BATCH_CONCURRENCY = 10
+
+# Seconds a batch job spends on LLM requests before handing the rest to
+# per-conversation jobs; well below the worker's job_timeout (600s)
+_BATCH_LLM_TIMEOUT = 420
+
+# Redis list of conversation IDs waiting to be summarized
+SUMMARIZATION_QUEUE_KEY = "summarize:pending"
+
+# Maximum number of conversation IDs drained into one batch job
+_MAX_BATCH_SIZE = 32
+
+# How long a transcript-digest -> summary entry lives in Redis (24 hours)
+_SUMMARY_CACHE_TTL = 86400
+
+
+# Statements are built once at import; call sites only bind parameters.
+# Updates skip ORM session synchronization (no Conversation objects are
+# loaded in these sessions).
+# Transcript text plus an idempotency flag for one conversation
+_SELECT_TRANSCRIPT = select(
+    Transcript.content,
+    select(Summary.id)
+    .where(Summary.conversation_id == bindparam("conversation_id"))
+    .exists()
+    .label("has_summary"),
+).where(Transcript.conversation_id == bindparam("conversation_id"))
+
+# Transcripts without a summary among a batch of conversations
+_SELECT_PENDING_TRANSCRIPTS = select(
+    Transcript.conversation_id, Transcript.content
+).where(
+    Transcript.conversation_id.in_(
+        bindparam("conversation_ids", expanding=True)
+    ),
+    ~select(Summary.id)
+    .where(Summary.conversation_id == Transcript.conversation_id)
+    .exists(),
+)
+
+# Batch summary insert; a conversation that a per-conversation job already
+# summarized keeps its row instead of failing the whole batch
+_INSERT_SUMMARIES = pg_insert(Summary).on_conflict_do_nothing(
+    index_elements=[Summary.conversation_id]
+)
+
+_MARK_COMPLETED = (
+    update(Conversation)
+    .where(Conversation.id.in_(bindparam("conversation_ids", expanding=True)))
+    .values(status="completed")
+    .execution_options(synchronize_session=False)
+)
+
+_MARK_FAILED = (
+    update(Conversation)
+    .where(Conversation.id == bindparam("conversation_id"))
+    .values(status="summarization_failed", error_detail=bindparam("detail"))
+    .execution_options(synchronize_session=False)
+)
+
+
+def _summary_cache_key(transcript_text: str) -> str:
+    """Build the Redis key for a transcript's cached summary."""
+    digest = hashlib.sha256(transcript_text.encode()).hexdigest()
+    return f"summary:{digest}"
+
+
+async def _cache_summary(
+    redis, cache_key: str, summary_result: SummaryResult
+) -> None:
+    """Store a summary in the cache; best-effort, failures are only logged."""
+    if summary_result.summary == SUMMARY_FAILED_TEXT:
+        return
+    try:
+        await redis.set(
+            cache_key,
+            msgspec.json.encode(summary_result),
+            ex=_SUMMARY_CACHE_TTL,
+        )
+    except Exception as exc:
+        logger.warning("Summary cache write failed for %s: %s", cache_key, exc)
+
 
 async def summarize_conversation(ctx: dict, conversation_id: str) -> None:
     """Summarize a conversation transcript and update status to completed.
 
-    Idempotent: skips if summary already exists for this conversation.
-    Retries once with 30s delay on failure. After 2 failed attempts, marks
-    conversation as 'summarization_failed' (partial success -- transcript
-    preserved).
+    Idempotent: skips if summary already exists for this conversation, or
+    if another worker currently holds the conversation's summarization
+    lease. Retries once with jittered exponential backoff on failure.
+    After 2 failed attempts, marks conversation as 'summarization_failed'
+    (partial success -- transcript preserved).
 
     Args:
-        ctx: ARQ worker context containing db_session_factory.
+        ctx: ARQ worker context containing db_session_factory, redis and
+            summarization_service.
         conversation_id: UUID string of the conversation to summarize.
     """
+    async with conversation_lease(
+        ctx["redis"], "summarize", conversation_id
+    ) as acquired:
+        if not acquired:
+            logger.info(
+                "Conversation %s is being summarized by another worker, skipping",
+                conversation_id,
+            )
+            return
+        await _summarize_conversation(ctx, conversation_id)
+
+
+async def _summarize_conversation(ctx: dict, conversation_id: str) -> None:
+    """Body of summarize_conversation, run while holding the lease."""
     job_try = ctx.get("job_try", 1)
     logger.info(
         "summarize_conversation started: conversation_id=%s, attempt=%d",
@@ -37,63 +149,69 @@ async def summarize_conversation(ctx: dict, conversation_id: str) -> None:
     )
 
     async with ctx["db_session_factory"]() as session:
-        # Idempotency check: skip if summary already exists
-        existing = await session.execute(
-            select(Summary).where(
-                Summary.conversation_id == conversation_id
-            )
+        # Fetch transcript text and idempotency flag in one round-trip
+        result = await session.execute(
+            _SELECT_TRANSCRIPT, {"conversation_id": conversation_id}
         )
-        if existing.scalar_one_or_none() is not None:
-            logger.info(
-                "Summary already exists for conversation %s, skipping",
+        row = result.one_or_none()
+        if row is None:
+            logger.error(
+                "Transcript not found for conversation %s, cannot summarize",
                 conversation_id,
             )
             return
 
-        # Fetch transcript for this conversation
-        result = await session.execute(
-            select(Transcript).where(
-                Transcript.conversation_id == conversation_id
-            )
-        )
-        transcript = result.scalar_one_or_none()
-        if transcript is None:
-            logger.error(
-                "Transcript not found for conversation %s, cannot summarize",
+        transcript_text, has_summary = row
+        # Idempotency check: skip if summary already exists
+        if has_summary:
+            logger.info(
+                "Summary already exists for conversation %s, skipping",
                 conversation_id,
             )
             return
 
         try:
-            # Read transcript content as plain text
-            transcript_text = transcript.content
-
-            # Generate summary via Grok
-            summarization_service = SummarizationService(
-                xai_api_key=settings.xai_api_key
-            )
-            summary_result = await summarization_service.summarize(
-                transcript_text
-            )
+            # Reuse a cached summary for this exact transcript (e.g. when a
+            # previous attempt summarized it but failed to commit)
+            redis = ctx["redis"]
+            cache_key = _summary_cache_key(transcript_text)
+            try:
+                cached = await redis.get(cache_key)
+            except Exception as exc:
+                logger.warning(
+                    "Summary cache read failed for conversation %s: %s",
+                    conversation_id,
+                    exc,
+                )
+                cached = None
+            if cached is not None:
+                summary_result = msgspec.json.decode(cached, type=SummaryResult)
+                logger.info(
+                    "Using cached summary for conversation %s", conversation_id
+                )
+            else:
+                # Generate summary via Grok
+                summarization_service: SummarizationService = ctx[
+                    "summarization_service"
+                ]
+                summary_result = await summarization_service.summarize(
+                    transcript_text
+                )
+                await _cache_summary(redis, cache_key, summary_result)
 
             # Store summary in database
             summary = Summary(
                 conversation_id=conversation_id,
                 content=summary_result.summary,
-                key_topics=json.dumps(summary_result.key_topics),
+                key_topics=serialization.dumps(summary_result.key_topics),
                 provider=summary_result.provider,
             )
             session.add(summary)
 
             # Update conversation status to completed
-            conv_result = await session.execute(
-                select(Conversation).where(
-                    Conversation.id == conversation_id
-                )
+            await session.execute(
+                _MARK_COMPLETED, {"conversation_ids": [conversation_id]}
             )
-            conversation = conv_result.scalar_one_or_none()
-            if conversation is not None:
-                conversation.status = "completed"
 
             await session.commit()
 
@@ -109,17 +227,14 @@ async def summarize_conversation(ctx: dict, conversation_id: str) -> None:
             if job_try >= 2:
                 # Max retries exhausted, mark as summarization_failed
                 # (partial success -- transcript is preserved)
-                async with ctx["db_session_factory"]() as fail_session:
-                    fail_result = await fail_session.execute(
-                        select(Conversation).where(
-                            Conversation.id == conversation_id
-                        )
-                    )
-                    fail_conv = fail_result.scalar_one_or_none()
-                    if fail_conv is not None:
-                        fail_conv.status = "summarization_failed"
-                        fail_conv.error_detail = f"Summarization: {str(exc)[:480]}"
-                        await fail_session.commit()
+                await session.execute(
+                    _MARK_FAILED,
+                    {
+                        "conversation_id": conversation_id,
+                        "detail": f"Summarization: {str(exc)[:480]}",
+                    },
+                )
+                await session.commit()
 
                 logger.error(
                     "Summarization failed after %d attempts for conversation %s: %s",
@@ -129,13 +244,270 @@ async def summarize_conversation(ctx: dict, conversation_id: str) -> None:
                 )
                 raise
 
-            # Retry once with 30s delay
-            defer_seconds = 30
+            # Retry with jittered exponential backoff (or provider Retry-After)
+            defer_seconds = retry_delay(exc, job_try)
             logger.warning(
-                "Summarization attempt %d failed for conversation %s, retrying in %ds: %s",
+                "Summarization attempt %d failed for conversation %s, retrying in %.0fs: %s",
                 job_try,
                 conversation_id,
                 defer_seconds,
                 exc,
             )
             raise Retry(defer=defer_seconds)
+
+
+async def summarize_conversations_batch(
+    ctx: dict, conversation_ids: list[str]
+) -> None:
+    """Summarize several conversations concurrently in one job.
+
+    Takes the summarization lease of every conversation (skipping those
+    another worker holds), fetches all pending transcripts with a single
+    query, reuses cached summaries and fires the remaining LLM requests
+    concurrently (bounded by _BATCH_CONCURRENCY), committing each summary
+    and status update as it completes. Conversations that already have a
+    summary are skipped. Conversations whose LLM call fails or misses
+    the _BATCH_LLM_TIMEOUT deadline, or whose commit fails, are
+    re-enqueued as individual summarize_conversation jobs so they get
+    the normal retry and failure handling.
+
+    The IDs were already trimmed off the summarization queue by the
+    drain, so if the job itself fails (a query, Redis call or lease
+    raises, or the job is cancelled) every conversation not yet
+    finished is pushed back onto the queue before the error propagates.
+
+    Args:
+        ctx: ARQ worker context containing db_session_factory, redis and
+            summarization_service.
+        conversation_ids: UUID strings of the conversations to summarize.
+    """
+    logger.info(
+        "summarize_conversations_batch started: %d conversations",
+        len(conversation_ids),
+    )
+
+    redis = ctx["redis"]
+    # Conversations that need nothing further from this job
+    finished: set[str] = set()
+    try:
+        async with AsyncExitStack() as leases:
+            leased_ids = []
+            for conversation_id in conversation_ids:
+                if await leases.enter_async_context(
+                    conversation_lease(redis, "summarize", conversation_id)
+                ):
+                    leased_ids.append(conversation_id)
+                else:
+                    finished.add(conversation_id)
+            if len(leased_ids) < len(conversation_ids):
+                logger.info(
+                    "Skipping %d conversations being summarized by another worker",
+                    len(conversation_ids) - len(leased_ids),
+                )
+            failed_ids = (
+                await _summarize_conversations_batch(ctx, leased_ids, finished)
+                if leased_ids
+                else []
+            )
+
+        # Hand failures to the per-conversation task for retry handling;
+        # done after the leases are released so those jobs can take them
+        for conversation_id in failed_ids:
+            await redis.enqueue_job(
+                "summarize_conversation",
+                conversation_id,
+                _job_id=f"summarize:{conversation_id}",
+            )
+            finished.add(conversation_id)
+    except BaseException:
+        unfinished = [
+            conversation_id
+            for conversation_id in conversation_ids
+            if conversation_id not in finished
+        ]
+        if unfinished:
+            logger.warning(
+                "Batch summarization job failed, requeueing %d conversations",
+                len(unfinished),
+            )
+            await _requeue_pending(redis, unfinished)
+        raise
+
+
+async def _summarize_conversations_batch(
+    ctx: dict, conversation_ids: list[str], finished: set[str]
+) -> list[str]:
+    """Body of summarize_conversations_batch, run while holding the leases.
+
+    Adds each conversation that is stored, or that needs no summary, to
+    ``finished`` as soon as that is durable.
+
+    Returns:
+        IDs of the conversations that could not be summarized.
+    """
+    async with ctx["db_session_factory"]() as session:
+        result = await session.execute(
+            _SELECT_PENDING_TRANSCRIPTS, {"conversation_ids": conversation_ids}
+        )
+        pending = result.all()
+        pending_ids = {str(conversation_id) for conversation_id, _ in pending}
+        finished.update(
+            conversation_id
+            for conversation_id in conversation_ids
+            if conversation_id not in pending_ids
+        )
+        if not pending:
+            logger.info("No pending transcripts in batch, skipping")
+            return []
+
+        redis = ctx["redis"]
+        summarization_service: SummarizationService = ctx[
+            "summarization_service"
+        ]
+        semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+        # Serializes writes on the shared session
+        session_lock = asyncio.Lock()
+        deadline = asyncio.get_running_loop().time() + _BATCH_LLM_TIMEOUT
+        cache_keys = [_summary_cache_key(content) for _, content in pending]
+        try:
+            cached_values = await redis.mget(cache_keys)
+        except Exception as exc:
+            logger.warning("Summary cache read failed for batch: %s", exc)
+            cached_values = [None] * len(cache_keys)
+        failed_ids = []
+
+        async def _summarize_one(
+            conversation_id,
+            transcript_text: str,
+            cache_key: str,
+            cached: bytes | None,
+        ) -> None:
+            try:
+                if cached is not None:
+                    summary_result = msgspec.json.decode(
+                        cached, type=SummaryResult
+                    )
+                else:
+                    async with asyncio.timeout_at(deadline), semaphore:
+                        summary_result = await summarization_service.summarize(
+                            transcript_text
+                        )
+                    await _cache_summary(redis, cache_key, summary_result)
+            except Exception as exc:
+                logger.warning(
+                    "Batch summarization failed for conversation %s: %r",
+                    conversation_id,
+                    exc,
+                )
+                failed_ids.append(str(conversation_id))
+                return
+
+            # Commit each summary on its own so finished work survives a
+            # later failure in the batch
+            async with session_lock:
+                try:
+                    await session.execute(
+                        _INSERT_SUMMARIES,
+                        [
+                            {
+                                "conversation_id": conversation_id,
+                                "content": summary_result.summary,
+                                "key_topics": serialization.dumps(
+                                    summary_result.key_topics
+                                ),
+                                "provider": summary_result.provider,
+                            }
+                        ],
+                    )
+                    await session.execute(
+                        _MARK_COMPLETED, {"conversation_ids": [conversation_id]}
+                    )
+                    await session.commit()
+                except Exception as exc:
+                    await session.rollback()
+                    logger.warning(
+                        "Batch summarization commit failed for conversation %s: %s",
+                        conversation_id,
+                        exc,
+                    )
+                    failed_ids.append(str(conversation_id))
+                    return
+            finished.add(str(conversation_id))
+
+        await asyncio.gather(
+            *(
+                _summarize_one(conversation_id, content, cache_key, cached)
+                for (conversation_id, content), cache_key, cached in zip(
+                    pending, cache_keys, cached_values
+                )
+            )
+        )
+
+    logger.info(
+        "Batch summarization complete: %d succeeded, %d failed",
+        len(pending) - len(failed_ids),
+        len(failed_ids),
+    )
+    return failed_ids
+
+
+async def drain_summarization_queue(ctx: dict) -> None:
+    """Move pending conversation IDs from the Redis queue into a job.
+
+    Runs as a cron job. Pops up to _MAX_BATCH_SIZE IDs atomically and
+    enqueues one summarize_conversations_batch job for them, or a plain
+    summarize_conversation job when only one ID is pending.
+
+    Args:
+        ctx: ARQ worker context containing redis.
+    """
+    redis = ctx["redis"]
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.lrange(SUMMARIZATION_QUEUE_KEY, 0, _MAX_BATCH_SIZE - 1)
+        pipe.ltrim(SUMMARIZATION_QUEUE_KEY, _MAX_BATCH_SIZE, -1)
+        raw_ids, _ = await pipe.execute()
+
+    conversation_ids = list(
+        dict.fromkeys(
+            raw.decode() if isinstance(raw, bytes) else raw for raw in raw_ids
+        )
+    )
+    if not conversation_ids:
+        return
+
+    try:
+        if len(conversation_ids) < 2:
+            await redis.enqueue_job(
+                "summarize_conversation",
+                conversation_ids[0],
+                _job_id=f"summarize:{conversation_ids[0]}",
+            )
+        else:
+            await redis.enqueue_job(
+                "summarize_conversations_batch", conversation_ids
+            )
+    except Exception:
+        # The IDs are already trimmed off the queue
+        await _requeue_pending(redis, conversation_ids)
+        raise
+    logger.info(
+        "Drained %d conversations from summarization queue",
+        len(conversation_ids),
+    )
+
+
+async def _requeue_pending(redis, conversation_ids: list[str]) -> None:
+    """Put conversation IDs back at the head of the summarization queue.
+
+    Keeps their original order so the next drain picks them up first.
+    Called while another error is propagating, so a failure here is
+    logged with the IDs rather than raised over the original error.
+    """
+    try:
+        await redis.lpush(SUMMARIZATION_QUEUE_KEY, *reversed(conversation_ids))
+    except Exception as exc:
+        logger.error(
+            "Failed to requeue conversations for summarization %s: %s",
+            conversation_ids,
+            exc,
+        )
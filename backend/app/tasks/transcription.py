@@ -4,30 +4,122 @@ Processes audio files through TranscriptionService (OpenAI Whisper),
 stores results in the transcripts table, and chains to summarization.
 """
 
+import hashlib
 import logging
+from datetime import timedelta
 
+import msgspec
 from arq import Retry
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, select, update
 
-from app.core.config import settings
 from app.models.conversation import Conversation, Transcript
 from app.services.storage_service import StorageService
-from app.services.transcription_service import TranscriptionService
+from app.services.transcription_service import (
+    TranscriptionResult,
+    TranscriptionService,
+)
+from app.tasks.lease import conversation_lease
+from app.tasks.retry import retry_delay
+from app.tasks.summarization import SUMMARIZATION_QUEUE_KEY
 
 logger = logging.getLogger(__name__)
 
+# How long an audio-key -> transcript entry lives in Redis (7 days)
+_TRANSCRIPT_CACHE_TTL = 7 * 86400
+
+# A conversation still in 'uploaded' this long after its last update never
+# got (or lost) its transcription job
+_STUCK_UPLOAD_AFTER = timedelta(minutes=10)
+
+# Maximum number of stuck conversations re-enqueued per cron run
+_STUCK_UPLOAD_BATCH = 100
+
+
+# Statements are built once at import; call sites only bind parameters.
+# Updates skip ORM session synchronization (no Conversation objects are
+# loaded in these sessions).
+# Claims a conversation for transcription and returns its audio key. The
+# WHERE clause is the status guard and idempotency check: no row comes
+# back if the conversation is missing, has no audio, already has a
+# transcript, or is not in 'uploaded'/'transcribing'.
+_CLAIM_FOR_TRANSCRIPTION = (
+    update(Conversation)
+    .where(
+        Conversation.id == bindparam("conversation_id"),
+        Conversation.status.in_(("uploaded", "transcribing")),
+        Conversation.audio_storage_key.is_not(None),
+        ~select(Transcript.id)
+        .where(Transcript.conversation_id == bindparam("conversation_id"))
+        .exists(),
+    )
+    .values(status="transcribing")
+    .returning(Conversation.audio_storage_key)
+    .execution_options(synchronize_session=False)
+)
+
+_SELECT_STUCK_UPLOADS = (
+    select(Conversation.id)
+    .where(
+        Conversation.status == "uploaded",
+        Conversation.updated_at < func.now() - _STUCK_UPLOAD_AFTER,
+    )
+    .order_by(Conversation.updated_at)
+    .limit(_STUCK_UPLOAD_BATCH)
+)
+
+_MARK_TRANSCRIBED = (
+    update(Conversation)
+    .where(Conversation.id == bindparam("conversation_id"))
+    .values(status="transcribed")
+    .execution_options(synchronize_session=False)
+)
+
+_MARK_FAILED = (
+    update(Conversation)
+    .where(Conversation.id == bindparam("conversation_id"))
+    .values(status="failed", error_detail=bindparam("detail"))
+    .execution_options(synchronize_session=False)
+)
+
+
+def _transcript_cache_key(audio_storage_key: str) -> str:
+    """Build the Redis key for an audio object's cached transcript.
+
+    audio_storage_key embeds the conversation_id, so an entry is only
+    ever hit by a retry of the same conversation (e.g. after a failed
+    commit), never by identical audio uploaded for another conversation.
+    """
+    digest = hashlib.sha256(audio_storage_key.encode()).hexdigest()
+    return f"transcript:v1:{digest}"
+
 
 async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
     """Transcribe a conversation's audio and chain to summarization.
 
-    Idempotent: skips if transcript already exists for this conversation.
-    Retries once with 30s delay on failure.
+    Idempotent: skips if transcript already exists for this conversation,
+    or if another worker currently holds the conversation's transcription
+    lease. Retries once with jittered exponential backoff on failure.
     After 2 failed attempts, marks conversation as "failed".
 
     Args:
-        ctx: ARQ worker context containing db_session_factory and redis.
+        ctx: ARQ worker context containing db_session_factory, redis and
+            transcription_service.
         conversation_id: UUID string of the conversation to transcribe.
     """
+    async with conversation_lease(
+        ctx["redis"], "transcribe", conversation_id
+    ) as acquired:
+        if not acquired:
+            logger.info(
+                "Conversation %s is being transcribed by another worker, skipping",
+                conversation_id,
+            )
+            return
+        await _transcribe_conversation(ctx, conversation_id)
+
+
+async def _transcribe_conversation(ctx: dict, conversation_id: str) -> None:
+    """Body of transcribe_conversation, run while holding the lease."""
     job_try = ctx.get("job_try", 1)
     logger.info(
         "transcribe_conversation started: conversation_id=%s, attempt=%d",
@@ -36,63 +128,74 @@ async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
     )
 
     async with ctx["db_session_factory"]() as session:
-        # Idempotency check: skip if transcript already exists
-        existing = await session.execute(
-            select(Transcript).where(
-                Transcript.conversation_id == conversation_id
-            )
-        )
-        if existing.scalar_one_or_none() is not None:
-            logger.info(
-                "Transcript already exists for conversation %s, skipping",
-                conversation_id,
-            )
-            return
-
-        # Fetch conversation
+        # Claim the conversation and fetch its audio key in one statement
         result = await session.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
+            _CLAIM_FOR_TRANSCRIPTION, {"conversation_id": conversation_id}
         )
-        conversation = result.scalar_one_or_none()
-        if conversation is None:
-            logger.error(
-                "Conversation %s not found, aborting transcription",
-                conversation_id,
-            )
-            return
-
-        # Check valid status for transcription
-        if conversation.status not in ("uploaded", "transcribing"):
-            logger.warning(
-                "Conversation %s has status '%s', expected 'uploaded' or 'transcribing'. Skipping.",
+        audio_storage_key = result.scalar_one_or_none()
+        if audio_storage_key is None:
+            await session.rollback()
+            logger.info(
+                "Conversation %s not found, has no audio, is already "
+                "transcribed or is not in a transcribable status, skipping",
                 conversation_id,
-                conversation.status,
             )
             return
+        await session.commit()
 
         try:
-            # Update status to transcribing
-            conversation.status = "transcribing"
-            await session.commit()
-
-            # Generate presigned download URL for the audio file
-            storage = StorageService()
-            download_url = storage.generate_download_url(
-                key=conversation.audio_storage_key,
-                expires_in=3600,
-            )
+            # Reuse a cached transcript for this audio object (e.g. when a
+            # previous attempt transcribed it but failed to commit)
+            redis = ctx["redis"]
+            cache_key = _transcript_cache_key(audio_storage_key)
+            try:
+                cached = await redis.get(cache_key)
+            except Exception as exc:
+                logger.warning(
+                    "Transcript cache read failed for conversation %s: %s",
+                    conversation_id,
+                    exc,
+                )
+                cached = None
+            if cached is not None:
+                transcription_result = msgspec.json.decode(
+                    cached, type=TranscriptionResult
+                )
+                logger.info(
+                    "Using cached transcript for conversation %s",
+                    conversation_id,
+                )
+            else:
+                # Generate presigned download URL for the audio file
+                storage = StorageService()
+                download_url = storage.generate_download_url(
+                    key=audio_storage_key,
+                    expires_in=3600,
+                )
 
-            # Transcribe with OpenAI Whisper
-            transcription_service = TranscriptionService(
-                openai_api_key=settings.openai_api_key,
-            )
-            transcription_result = await transcription_service.transcribe(
-                download_url
-            )
+                # Transcribe with OpenAI Whisper
+                transcription_service: TranscriptionService = ctx[
+                    "transcription_service"
+                ]
+                transcription_result = await transcription_service.transcribe(
+                    download_url
+                )
+                try:
+                    await redis.set(
+                        cache_key,
+                        msgspec.json.encode(transcription_result),
+                        ex=_TRANSCRIPT_CACHE_TTL,
+                    )
+                except Exception as exc:
+                    logger.warning(
+                        "Transcript cache write failed for conversation %s: %s",
+                        conversation_id,
+                        exc,
+                    )
 
             # Store transcript in database
             transcript = Transcript(
-                conversation_id=conversation.id,
+                conversation_id=conversation_id,
                 content=transcription_result.full_text,
                 provider=transcription_result.provider,
                 language=transcription_result.language,
@@ -101,7 +204,9 @@ async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
             session.add(transcript)
 
             # Update conversation status
-            conversation.status = "transcribed"
+            await session.execute(
+                _MARK_TRANSCRIBED, {"conversation_id": conversation_id}
+            )
             await session.commit()
 
             logger.info(
@@ -111,13 +216,10 @@ async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
                 transcription_result.word_count,
             )
 
-            # Chain to summarization task
-            redis = ctx["redis"]
-            await redis.enqueue_job(
-                "summarize_conversation", str(conversation_id)
-            )
+            # Chain to summarization: queue for the next batch drain
+            await redis.rpush(SUMMARIZATION_QUEUE_KEY, str(conversation_id))
             logger.info(
-                "Enqueued summarization for conversation %s",
+                "Queued summarization for conversation %s",
                 conversation_id,
             )
 
@@ -126,17 +228,11 @@ async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
 
             if job_try >= 2:
                 # Max retries exhausted, mark as failed
-                async with ctx["db_session_factory"]() as fail_session:
-                    fail_result = await fail_session.execute(
-                        select(Conversation).where(
-                            Conversation.id == conversation_id
-                        )
-                    )
-                    fail_conv = fail_result.scalar_one_or_none()
-                    if fail_conv is not None:
-                        fail_conv.status = "failed"
-                        fail_conv.error_detail = str(exc)[:500]
-                        await fail_session.commit()
+                await session.execute(
+                    _MARK_FAILED,
+                    {"conversation_id": conversation_id, "detail": str(exc)[:500]},
+                )
+                await session.commit()
 
                 logger.error(
                     "Transcription failed after %d attempts for conversation %s: %s",
@@ -146,13 +242,43 @@ async def transcribe_conversation(ctx: dict, conversation_id: str) -> None:
                 )
                 raise
 
-            # Retry with fixed 30s delay
-            defer_seconds = 30
+            # Retry with jittered exponential backoff (or provider Retry-After)
+            defer_seconds = retry_delay(exc, job_try)
             logger.warning(
-                "Transcription attempt %d failed for conversation %s, retrying in %ds: %s",
+                "Transcription attempt %d failed for conversation %s, retrying in %.0fs: %s",
                 job_try,
                 conversation_id,
                 defer_seconds,
                 exc,
             )
             raise Retry(defer=defer_seconds)
+
+
+async def requeue_stuck_uploads(ctx: dict) -> None:
+    """Re-enqueue transcription for conversations stuck in 'uploaded'.
+
+    Runs as a cron job. confirm_upload only logs a failed enqueue (e.g. a
+    Redis blip), so such conversations are recovered here. The
+    transcribe:{id} job ID dedupes against a job that is still queued, and
+    the claim in transcribe_conversation skips anything already done.
+
+    Args:
+        ctx: ARQ worker context containing db_session_factory and redis.
+    """
+    async with ctx["db_session_factory"]() as session:
+        result = await session.execute(_SELECT_STUCK_UPLOADS)
+        conversation_ids = [str(row) for row in result.scalars()]
+    if not conversation_ids:
+        return
+
+    redis = ctx["redis"]
+    for conversation_id in conversation_ids:
+        await redis.enqueue_job(
+            "transcribe_conversation",
+            conversation_id=conversation_id,
+            _job_id=f"transcribe:{conversation_id}",
+        )
+    logger.warning(
+        "Re-enqueued transcription for %d conversations stuck in 'uploaded'",
+        len(conversation_ids),
+    )
@@ -7,46 +7,104 @@ Requires Redis to be running and accessible at the URL configured
 in settings.redis_url.
 """
 
+import asyncio
 import logging
 
-from arq.connections import RedisSettings, create_pool
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import httpx
+from arq import cron
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.core import serialization
 from app.core.config import settings
-from app.tasks.summarization import summarize_conversation
-from app.tasks.transcription import transcribe_conversation
+from app.core.database import create_db_engine
+from app.core.redis import create_arq_redis
+from app.services.summarization_service import SummarizationService
+from app.services.transcription_service import TranscriptionService
+from app.tasks.summarization import (
+    drain_summarization_queue,
+    summarize_conversation,
+    summarize_conversations_batch,
+)
+from app.tasks.transcription import (
+    requeue_stuck_uploads,
+    transcribe_conversation,
+)
 
 logger = logging.getLogger(__name__)
 
+# The arq CLI imports this module before the Worker creates its event loop,
+# so installing the policy here runs the worker on uvloop (the API gets it
+# from uvicorn's default --loop auto).
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    pass
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# Connection limits for the HTTP client shared by the provider services
+_HTTP_MAX_CONNECTIONS = 20
+_HTTP_KEEPALIVE_EXPIRY = 60.0
+
 
 async def startup(ctx: dict) -> None:
-    """Worker startup hook. Creates DB session factory and Redis pool.
+    """Worker startup hook. Creates DB session factory and services.
 
     Called once when the worker process starts. Stores shared resources
-    in the context dict for use by all task functions.
+    in the context dict for use by all task functions. ARQ itself puts
+    its (bounded) Redis pool in ctx["redis"] before this hook runs, so
+    tasks share that pool rather than opening a second one.
     """
-    engine = create_async_engine(
-        settings.database_url,
-        echo=settings.debug,
-        pool_pre_ping=True,
+    # One connection per concurrent job; no overflow so a burst cannot
+    # open more connections than the worker can use
+    engine = create_db_engine(
+        pool_size=WorkerSettings.max_jobs, max_overflow=0
     )
     ctx["engine"] = engine
     ctx["db_session_factory"] = async_sessionmaker(
         engine, expire_on_commit=False
     )
 
-    ctx["redis"] = await create_pool(
-        RedisSettings.from_dsn(settings.redis_url)
+    # Provider clients are shared by all jobs so their HTTP connection
+    # pools (and TLS sessions) survive across jobs. Audio downloads and
+    # Grok calls go through one HTTP/2 client, which multiplexes
+    # concurrent batch requests over a single connection per host.
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=_HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    ctx["http_client"] = http_client
+    ctx["transcription_service"] = TranscriptionService(
+        openai_api_key=settings.openai_api_key,
+        http_client=http_client,
+    )
+    ctx["summarization_service"] = SummarizationService(
+        xai_api_key=settings.xai_api_key,
+        http_client=http_client,
     )
 
     logger.info("Worker started with DB and Redis connections")
 
 
 async def shutdown(ctx: dict) -> None:
-    """Worker shutdown hook. Disposes of the database engine.
+    """Worker shutdown hook. Closes provider clients and the DB engine.
 
     Called once when the worker process stops. Cleans up shared resources.
     """
+    transcription_service = ctx.get("transcription_service")
+    if transcription_service is not None:
+        await transcription_service.aclose()
+    summarization_service = ctx.get("summarization_service")
+    if summarization_service is not None:
+        await summarization_service.aclose()
+    http_client = ctx.get("http_client")
+    if http_client is not None:
+        await http_client.aclose()
+
     engine = ctx.get("engine")
     if engine is not None:
         await engine.dispose()
@@ -57,13 +115,29 @@ class WorkerSettings:
     """ARQ worker settings.
 
     Configures the task queue worker with Redis connection,
-    registered task functions, and lifecycle hooks.
+    registered task functions, cron jobs, and lifecycle hooks.
     """
 
-    functions = [transcribe_conversation, summarize_conversation]
+    functions = [
+        transcribe_conversation,
+        summarize_conversation,
+        summarize_conversations_batch,
+    ]
+    cron_jobs = [
+        # Batch newly transcribed conversations into summarization jobs
+        cron(drain_summarization_queue, second=None),
+        # Recover uploads whose transcription enqueue failed
+        cron(requeue_stuck_uploads, minute=set(range(0, 60, 5))),
+    ]
     on_startup = startup
     on_shutdown = shutdown
-    redis_settings = RedisSettings.from_dsn(settings.redis_url)
+    # Bounded, blocking pool: at the cap jobs wait for a connection instead
+    # of failing with "Too many connections"
+    redis_pool = create_arq_redis()
     max_jobs = 5
     job_timeout = 600  # 10 minutes
     max_tries = 2  # 1 retry = 2 total attempts
+    # Tasks return None, so skip writing a result key per job
+    keep_result = 0
+    job_serializer = serialization.job_serializer
+    job_deserializer = serialization.job_deserializer
@@ -1,12 +1,12 @@
 import logging
 from contextlib import asynccontextmanager
 
-from arq.connections import RedisSettings, create_pool
 from fastapi import FastAPI
 
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.database import engine
+from app.core.redis import create_arq_redis
 
 logger = logging.getLogger(__name__)
 
@@ -15,20 +15,21 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Manage application startup and shutdown lifecycle."""
     # Startup: create ARQ connection pool for job enqueuing
+    arq_pool = create_arq_redis()
     try:
-        app.state.arq_pool = await create_pool(
-            RedisSettings.from_dsn(settings.redis_url)
-        )
+        await arq_pool.ping()
+        app.state.arq_pool = arq_pool
         logger.info("ARQ connection pool created")
     except Exception as exc:
         logger.warning("Failed to create ARQ pool: %s. Job enqueuing disabled.", exc)
+        await arq_pool.close(close_connection_pool=True)
         app.state.arq_pool = None
 
     yield
 
     # Shutdown: close ARQ pool and dispose database engine
     if getattr(app.state, "arq_pool", None) is not None:
-        await app.state.arq_pool.close()
+        await app.state.arq_pool.close(close_connection_pool=True)
         logger.info("ARQ connection pool closed")
     await engine.dispose()
 
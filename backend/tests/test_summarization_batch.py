@@ -0,0 +1,175 @@
+"""Tests for the summarization batch job's requeue-on-failure handling."""
+
+import unittest
+import unittest.mock
+from contextlib import asynccontextmanager
+
+from app.services.summarization_service import SummaryResult
+from app.tasks import summarization
+from app.tasks.summarization import (
+    SUMMARIZATION_QUEUE_KEY,
+    summarize_conversations_batch,
+)
+
+CONVERSATION_IDS = ["c1", "c2", "c3"]
+
+
+class FakeRedis:
+    """Just enough of ArqRedis for the batch job."""
+
+    def __init__(self, mget_error: Exception | None = None):
+        self.mget_error = mget_error
+        self.lists: dict[str, list[str]] = {}
+        self.enqueued: list[tuple] = []
+
+    async def mget(self, keys):
+        if self.mget_error is not None:
+            raise self.mget_error
+        return [None] * len(keys)
+
+    async def set(self, key, value, ex=None):
+        pass
+
+    async def lpush(self, key, *values):
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, value)
+
+    async def enqueue_job(self, function, *args, **kwargs):
+        self.enqueued.append((function, args, kwargs))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, select_error: Exception | None, rows):
+        self.select_error = select_error
+        self.rows = rows
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement, params=None):
+        if self.select_error is not None:
+            raise self.select_error
+        return FakeResult(self.rows)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class FakeSummarizationService:
+    """Summarizes every transcript except those listed in ``failing``."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    async def summarize(self, transcript_text):
+        if transcript_text in self.failing:
+            raise TimeoutError
+        return SummaryResult(
+            summary=f"summary of {transcript_text}",
+            key_topics=["topic"],
+            provider="fake",
+        )
+
+
+@asynccontextmanager
+async def always_acquired(redis, task, conversation_id):
+    yield True
+
+
+class SummarizeBatchRequeueTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = unittest.mock.patch.object(
+            summarization, "conversation_lease", always_acquired
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_ctx(self, redis, select_error=None, rows=(), service=None):
+        self.session = FakeSession(select_error, list(rows))
+        return {
+            "redis": redis,
+            "db_session_factory": lambda: self.session,
+            "summarization_service": service,
+        }
+
+    async def test_select_failure_requeues_all_ids(self):
+        redis = FakeRedis()
+        ctx = self.make_ctx(redis, select_error=ConnectionError("db down"))
+
+        with self.assertRaises(ConnectionError):
+            await summarize_conversations_batch(ctx, CONVERSATION_IDS)
+
+        self.assertEqual(redis.lists[SUMMARIZATION_QUEUE_KEY], CONVERSATION_IDS)
+        self.assertEqual(redis.enqueued, [])
+
+    async def test_lease_failure_requeues_all_ids(self):
+        redis = FakeRedis()
+        ctx = self.make_ctx(redis)
+
+        @asynccontextmanager
+        async def failing_lease(redis, task, conversation_id):
+            if conversation_id == "c2":
+                raise ConnectionError("redis down")
+            yield True
+
+        with unittest.mock.patch.object(
+            summarization, "conversation_lease", failing_lease
+        ):
+            with self.assertRaises(ConnectionError):
+                await summarize_conversations_batch(ctx, CONVERSATION_IDS)
+
+        self.assertEqual(redis.lists[SUMMARIZATION_QUEUE_KEY], CONVERSATION_IDS)
+
+    async def test_mget_failure_falls_back_to_llm(self):
+        redis = FakeRedis(mget_error=ConnectionError("redis down"))
+        # c3 already has a summary, so the SELECT does not return it
+        rows = [("c1", "first transcript"), ("c2", "second transcript")]
+        service = FakeSummarizationService()
+        ctx = self.make_ctx(redis, rows=rows, service=service)
+
+        await summarize_conversations_batch(ctx, CONVERSATION_IDS)
+
+        self.assertEqual(self.session.commits, 2)
+        self.assertEqual(redis.enqueued, [])
+        self.assertNotIn(SUMMARIZATION_QUEUE_KEY, redis.lists)
+
+    async def test_llm_failure_commits_others_and_enqueues_failed_id(self):
+        redis = FakeRedis()
+        rows = [("c1", "first transcript"), ("c2", "second transcript")]
+        service = FakeSummarizationService(failing=["second transcript"])
+        ctx = self.make_ctx(redis, rows=rows, service=service)
+
+        await summarize_conversations_batch(ctx, CONVERSATION_IDS)
+
+        self.assertEqual(self.session.commits, 1)
+        self.assertEqual(
+            redis.enqueued,
+            [
+                (
+                    "summarize_conversation",
+                    ("c2",),
+                    {"_job_id": "summarize:c2"},
+                )
+            ],
+        )
+        self.assertNotIn(SUMMARIZATION_QUEUE_KEY, redis.lists)
+
+
+if __name__ == "__main__":
+    unittest.main()
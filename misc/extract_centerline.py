@@ -8,28 +8,48 @@ assemble segments in the known stroke order using the "Le" topology.
 
 Usage:
     python3 misc/extract_centerline.py
+    EXTRACT_CENTERLINE_VERBOSE=1 python3 misc/extract_centerline.py  # full diagnostics
+    python3 misc/extract_centerline.py a.png b.png ...  # batch, one process per image
 """
 
+import io
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import numpy as np
 from PIL import Image
 from skimage.morphology import skeletonize
-from scipy.ndimage import gaussian_filter1d, label as ndlabel
+from scipy.ndimage import convolve, correlate1d, label as ndlabel
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+try:
+    from pybind11_rdp import rdp as _rdp_cpp
+except ImportError:
+    _rdp_cpp = None
 
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 ALPHA_THRESHOLD = 128
 PRUNE_MIN_LENGTH = 20
+NUMBA_MIN_PIXELS = 50_000        # skeleton size above which pruning is JIT-compiled
 GAUSSIAN_SIGMA = 7
 RDP_EPSILON = 1.8
+PATH_RDP_EPSILON = 0.25          # px tolerance for the final pre-emit RDP pass (0 = off)
 CATMULL_ROM_ALPHA = 0.5
 ASCENDER_LOOP_TARGET_GAP = 6.0   # SVG-unit gap at widest point of loop
 LOOP_TRANSITION_FRAC = 0.125     # fraction of loop for each transition zone
 STEM_SAMPLE_HEIGHT_PX = 55       # px window below loop for median stem_x
 LOCAL_SMOOTH_SIGMA = 2.5         # Gaussian sigma for post-compression cleanup
 
+# Per-cluster / per-segment / per-step diagnostics; set
+# EXTRACT_CENTERLINE_VERBOSE=1 to print them
+VERBOSE = os.environ.get("EXTRACT_CENTERLINE_VERBOSE", "").strip().lower() in {"1", "true", "yes", "on"}
+
 TARGET_VB_WIDTH = 241
 TARGET_VB_HEIGHT = 273
 PADDING = 10
@@ -38,58 +58,91 @@ PADDING = 10
 # ---------------------------------------------------------------------------
 # Utilities
 # ---------------------------------------------------------------------------
-def _perpendicular_distance(point, line_start, line_end):
-    dx = line_end[0] - line_start[0]
-    dy = line_end[1] - line_start[1]
-    if dx == 0 and dy == 0:
-        return np.hypot(point[0] - line_start[0], point[1] - line_start[1])
-    t = ((point[0] - line_start[0]) * dx + (point[1] - line_start[1]) * dy) / (dx * dx + dy * dy)
-    t = max(0, min(1, t))
-    proj_x = line_start[0] + t * dx
-    proj_y = line_start[1] + t * dy
-    return np.hypot(point[0] - proj_x, point[1] - proj_y)
+def _rdp_simplify_np(points, epsilon):
+    """Iterative RDP: each segment's interior distances are computed in one
+    vectorized pass, with a work stack instead of recursion."""
+    pts = np.asarray(points, dtype=np.float64)
+    n = len(pts)
+    if n <= 2:
+        return [tuple(p) for p in pts.tolist()]
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        sx, sy = pts[lo]
+        dx = pts[hi, 0] - sx
+        dy = pts[hi, 1] - sy
+        px = pts[lo + 1:hi, 0]
+        py = pts[lo + 1:hi, 1]
+        if dx == 0 and dy == 0:
+            d = np.hypot(px - sx, py - sy)
+        else:
+            t = ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)
+            np.clip(t, 0, 1, out=t)
+            d = np.hypot(px - (sx + t * dx), py - (sy + t * dy))
+        i = int(np.argmax(d))
+        if d[i] > epsilon:
+            mid = lo + 1 + i
+            keep[mid] = True
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+    return [tuple(p) for p in pts[keep].tolist()]
 
 
 def rdp_simplify(points, epsilon):
-    if len(points) <= 2:
-        return points
-    dmax = 0
-    idx = 0
-    for i in range(1, len(points) - 1):
-        d = _perpendicular_distance(points[i], points[0], points[-1])
-        if d > dmax:
-            dmax = d
-            idx = i
-    if dmax > epsilon:
-        left = rdp_simplify(points[:idx + 1], epsilon)
-        right = rdp_simplify(points[idx:], epsilon)
-        return left[:-1] + right
-    else:
-        return [points[0], points[-1]]
+    """Ramer-Douglas-Peucker simplification of an (N, 2) array or list of
+    (x, y) points.  Uses the pybind11-rdp C++ implementation when it is
+    installed and a vectorized NumPy implementation otherwise."""
+    if _rdp_cpp is None or len(points) <= 2:
+        return _rdp_simplify_np(points, epsilon)
+    simplified = _rdp_cpp(np.asarray(points, dtype=np.float64), epsilon=epsilon)
+    return [tuple(p) for p in simplified.tolist()]
 
 
 def chaikin_subdivide(points, iterations=2):
     """Chaikin corner-cutting: each iteration replaces edge AB with two points
     at 25% and 75% positions.  Endpoints are kept fixed.  Two iterations
     reduce a 90-degree corner to ~22 degrees."""
-    pts = list(points)
+    pts = np.asarray(points, dtype=np.float64)
     for _ in range(iterations):
         if len(pts) < 3:
             break
-        new = [pts[0]]
-        for i in range(len(pts) - 1):
-            ax, ay = pts[i]
-            bx, by = pts[i + 1]
-            new.append((0.75 * ax + 0.25 * bx, 0.75 * ay + 0.25 * by))
-            new.append((0.25 * ax + 0.75 * bx, 0.25 * ay + 0.75 * by))
-        new.append(pts[-1])
+        new = np.empty((2 * len(pts), 2))
+        new[0] = pts[0]
+        new[1:-1:2] = 0.75 * pts[:-1] + 0.25 * pts[1:]
+        new[2:-1:2] = 0.25 * pts[:-1] + 0.75 * pts[1:]
+        new[-1] = pts[-1]
         pts = new
     return pts
 
 
+@lru_cache(maxsize=None)
+def _gaussian_kernel(sigma, truncate=4.0):
+    """1-D Gaussian weights, built the same way as scipy's
+    gaussian_filter1d and cached per sigma."""
+    radius = int(truncate * float(sigma) + 0.5)
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 / (sigma * sigma) * x ** 2)
+    kernel /= kernel.sum()
+    kernel.setflags(write=False)
+    return kernel
+
+
+def gaussian_smooth(values, sigma, axis=0):
+    """Gaussian smoothing along one axis (every column at once for an
+    (N, 2) array); same result and 'reflect' boundary as
+    gaussian_filter1d.  Direct convolution beats FFT at these kernel
+    sizes (57 and 145 taps) on a path of a few thousand points."""
+    return correlate1d(values, _gaussian_kernel(sigma), axis=axis, mode='reflect')
+
+
 def _smoothstep(t):
-    """Hermite smoothstep: 0 at t=0, 1 at t=1, zero derivative at both ends."""
-    t = max(0.0, min(1.0, t))
+    """Hermite smoothstep: 0 at t=0, 1 at t=1, zero derivative at both ends.
+    Accepts a scalar or an ndarray."""
+    t = np.clip(t, 0.0, 1.0)
     return t * t * (3.0 - 2.0 * t)
 
 
@@ -102,67 +155,68 @@ def compress_ascender_loop(points, target_gap_svg=ASCENDER_LOOP_TARGET_GAP):
     - Local Gaussian cleanup on the loop region after compression
 
     Args:
-        points: list of (x, y) tuples (already in SVG x/y space, i.e.
-                col=x, row=y after the smooth_and_simplify conversion).
+        points: (N, 2) array or list of (x, y) points (already in SVG x/y
+                space, i.e. col=x, row=y after the smooth_and_simplify
+                conversion).
         target_gap_svg: desired gap in SVG units between the two strokes
                 at the widest point of the loop (default 6.8).
 
     Returns:
-        New list of (x, y) tuples with the loop section compressed.
+        New (N, 2) float64 array with the loop section compressed.
     """
-    if len(points) < 20:
-        return points
+    pts = np.asarray(points, dtype=np.float64)
+    if len(pts) < 20:
+        return pts
+    xs = pts[:, 0]
+    ys = pts[:, 1]
 
     # 1. Find the peak -- the global y-minimum (topmost point of the "L").
-    peak_idx = min(range(len(points)), key=lambda i: points[i][1])
-    peak_x, peak_y = points[peak_idx]
+    peak_idx = int(np.argmin(ys))
+    peak_x, peak_y = pts[peak_idx]
 
     # 2. Robust stem_x via median of points in a y-based sample window below the loop.
     #    Collect x-values from points after the peak whose y is within
     #    STEM_SAMPLE_HEIGHT_PX of the peak -- these are the descent stroke
     #    where the loop merges back into the stem.
     stem_y_hi = peak_y + STEM_SAMPLE_HEIGHT_PX
-    stem_xs = [points[i][0] for i in range(peak_idx + 1, len(points))
-               if peak_y + 10 < points[i][1] <= stem_y_hi]
+    after_ys = ys[peak_idx + 1:]
+    stem_xs = xs[peak_idx + 1:][(peak_y + 10 < after_ys) & (after_ys <= stem_y_hi)]
     if len(stem_xs) < 3:
         # Fallback: use a fixed index window
-        descent_lo = min(peak_idx + 10, len(points) - 1)
-        descent_hi = min(peak_idx + 50, len(points))
+        descent_lo = min(peak_idx + 10, len(pts) - 1)
+        descent_hi = min(peak_idx + 50, len(pts))
         if descent_hi <= descent_lo:
             print("  [compress_ascender_loop] Not enough points after peak, skipping.")
-            return points
-        stem_xs = [points[i][0] for i in range(descent_lo, descent_hi)]
+            return pts
+        stem_xs = xs[descent_lo:descent_hi]
     stem_x = float(np.median(stem_xs))
 
     # 3. Walk backward from peak to find entry_idx where x returns to stem_x.
     entry_idx = peak_idx
-    for i in range(peak_idx - 1, -1, -1):
-        if points[i][0] <= stem_x:
-            entry_idx = i
-            break
+    before = np.flatnonzero(xs[:peak_idx] <= stem_x)
+    if len(before):
+        entry_idx = int(before[-1])
 
     # 4. Walk forward from peak to find exit_idx where x returns to stem_x.
     exit_idx = peak_idx
-    for i in range(peak_idx + 1, len(points)):
-        if points[i][0] <= stem_x:
-            exit_idx = i
-            break
+    after = np.flatnonzero(xs[peak_idx + 1:] <= stem_x)
+    if len(after):
+        exit_idx = peak_idx + 1 + int(after[0])
 
     if entry_idx == peak_idx or exit_idx == peak_idx:
         print("  [compress_ascender_loop] Could not find loop boundaries, skipping.")
-        return points
+        return pts
 
     # 4b. Extend exit to cover the full overlap zone.
     #     The ascending arm extends down to entry_idx's y-level. Points on the
     #     descending arm below exit_idx still have x != stem_x and create a
     #     visible gap if left uncompressed. Extend exit_idx until the
     #     descending arm reaches the same y-depth as the ascending entry.
-    entry_y = points[entry_idx][1]
+    entry_y = ys[entry_idx]
     orig_exit_idx = exit_idx
-    for i in range(exit_idx + 1, len(points)):
-        if points[i][1] >= entry_y:
-            exit_idx = i
-            break
+    deeper = np.flatnonzero(ys[exit_idx + 1:] >= entry_y)
+    if len(deeper):
+        exit_idx = exit_idx + 1 + int(deeper[0])
     if exit_idx != orig_exit_idx:
         print(f"  [compress_ascender_loop] Extended exit: {orig_exit_idx} -> {exit_idx} "
               f"(matching entry y={entry_y:.0f})")
@@ -170,65 +224,53 @@ def compress_ascender_loop(points, target_gap_svg=ASCENDER_LOOP_TARGET_GAP):
     loop_len = exit_idx - entry_idx
     if loop_len < 5:
         print("  [compress_ascender_loop] Loop too short, skipping.")
-        return points
+        return pts
 
     # Measure width before compression
-    loop_xs = [points[i][0] for i in range(entry_idx, exit_idx + 1)]
-    width_before = max(loop_xs) - min(loop_xs)
+    loop = slice(entry_idx, exit_idx + 1)
+    width_before = xs[loop].max() - xs[loop].min()
 
     # 5. Compute the scale factor that will be applied later (viewbox fitting).
-    all_xs = [p[0] for p in points]
-    all_ys = [p[1] for p in points]
-    src_w = max(all_xs) - min(all_xs)
-    src_h = max(all_ys) - min(all_ys)
+    src_w = xs.max() - xs.min()
+    src_h = ys.max() - ys.min()
     uw = TARGET_VB_WIDTH - 2 * PADDING
     uh = TARGET_VB_HEIGHT - 2 * PADDING
     scale = min(uw / src_w, uh / src_h) if src_w > 0 and src_h > 0 else 1.0
 
     target_gap_prescale = target_gap_svg / scale
-    max_dist = max(points[i][0] - stem_x for i in range(entry_idx, exit_idx + 1))
+    max_dist = (xs[loop] - stem_x).max()
 
     if max_dist < 1.0:
         print("  [compress_ascender_loop] Loop max distance too small, skipping.")
-        return points
+        return pts
 
     # Uniform ratio: every point keeps this fraction of its distance from stem_x.
     ratio = target_gap_prescale / max_dist
     ratio = min(ratio, 1.0)  # never expand
 
     # 6. Smoothstep transition zones + uniform core compression.
+    #    Blend factor: 0 = no compression, 1 = full compression (core zone).
     trans_len = max(3, int(loop_len * LOOP_TRANSITION_FRAC))
-    result = list(points)
-    for i in range(entry_idx, exit_idx + 1):
-        x, y = points[i]
-        # Determine blend factor (0 = no compression, 1 = full compression)
-        dist_from_entry = i - entry_idx
-        dist_from_exit = exit_idx - i
-        if dist_from_entry < trans_len:
-            blend = _smoothstep(dist_from_entry / trans_len)
-        elif dist_from_exit < trans_len:
-            blend = _smoothstep(dist_from_exit / trans_len)
-        else:
-            blend = 1.0  # core zone: full compression
-        effective_ratio = 1.0 - blend * (1.0 - ratio)
-        new_x = stem_x + (x - stem_x) * effective_ratio
-        result[i] = (new_x, y)
+    idx = np.arange(entry_idx, exit_idx + 1)
+    dist_from_entry = idx - entry_idx
+    dist_from_exit = exit_idx - idx
+    blend = np.where(
+        dist_from_entry < trans_len,
+        _smoothstep(dist_from_entry / trans_len),
+        np.where(dist_from_exit < trans_len, _smoothstep(dist_from_exit / trans_len), 1.0),
+    )
+    effective_ratio = 1.0 - blend * (1.0 - ratio)
+    result = pts.copy()
+    result[loop, 0] = stem_x + (xs[loop] - stem_x) * effective_ratio
 
     # 7. Local Gaussian cleanup on the compressed region only.
     #    Do NOT extend past entry/exit boundaries -- blending with
     #    uncompressed neighbors would undo compression near the edges.
-    loop_slice = slice(entry_idx,
-                       min(len(result), exit_idx + 1))
-    indices = list(range(*loop_slice.indices(len(result))))
-    if len(indices) > 3:
-        loop_xs_arr = np.array([result[i][0] for i in indices])
-        loop_xs_smooth = gaussian_filter1d(loop_xs_arr, sigma=LOCAL_SMOOTH_SIGMA)
-        for j, i in enumerate(indices):
-            result[i] = (float(loop_xs_smooth[j]), result[i][1])
+    if exit_idx + 1 - entry_idx > 3:
+        result[loop, 0] = gaussian_smooth(result[loop, 0], LOCAL_SMOOTH_SIGMA)
 
     # Measure width after
-    loop_xs_after = [result[i][0] for i in range(entry_idx, exit_idx + 1)]
-    width_after = max(loop_xs_after) - min(loop_xs_after)
+    width_after = result[loop, 0].max() - result[loop, 0].min()
     print(f"  [compress_ascender_loop] Loop idx {entry_idx}-{exit_idx} "
           f"(peak={peak_idx}), stem_x={stem_x:.1f} (median)")
     print(f"  [compress_ascender_loop] Width: {width_before:.1f} -> {width_after:.1f} "
@@ -239,25 +281,54 @@ def compress_ascender_loop(points, target_gap_svg=ASCENDER_LOOP_TARGET_GAP):
     return result
 
 
+NEIGHBOR_DELTAS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
 def get_8_neighbors(skeleton, r, c):
-    neighbors = []
-    for dr in [-1, 0, 1]:
-        for dc in [-1, 0, 1]:
-            if dr == 0 and dc == 0:
-                continue
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < skeleton.shape[0] and 0 <= nc < skeleton.shape[1]:
-                if skeleton[nr, nc]:
-                    neighbors.append((nr, nc))
-    return neighbors
+    h, w = skeleton.shape
+    item = skeleton.item  # scalar read without ndarray indexing overhead
+    if 0 < r < h - 1 and 0 < c < w - 1:
+        # Interior pixel: all 8 neighbors are in bounds, reads unrolled
+        neighbors = []
+        if item(r - 1, c - 1):
+            neighbors.append((r - 1, c - 1))
+        if item(r - 1, c):
+            neighbors.append((r - 1, c))
+        if item(r - 1, c + 1):
+            neighbors.append((r - 1, c + 1))
+        if item(r, c - 1):
+            neighbors.append((r, c - 1))
+        if item(r, c + 1):
+            neighbors.append((r, c + 1))
+        if item(r + 1, c - 1):
+            neighbors.append((r + 1, c - 1))
+        if item(r + 1, c):
+            neighbors.append((r + 1, c))
+        if item(r + 1, c + 1):
+            neighbors.append((r + 1, c + 1))
+        return neighbors
+    return [(r + dr, c + dc) for dr, dc in NEIGHBOR_DELTAS
+            if 0 <= r + dr < h and 0 <= c + dc < w and item(r + dr, c + dc)]
+
+
+_NEIGHBOR_KERNEL = np.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=np.uint8)
+
+
+def neighbor_count_map(skeleton):
+    """8-neighbor count of every pixel in one convolution (0 outside the
+    image, matching get_8_neighbors' bounds checks)."""
+    return convolve(skeleton.astype(np.uint8), _NEIGHBOR_KERNEL, mode='constant', cval=0)
 
 
 # ---------------------------------------------------------------------------
 # Image processing
 # ---------------------------------------------------------------------------
 def load_and_binarize(image_path, threshold=ALPHA_THRESHOLD):
-    img = Image.open(image_path).convert("RGBA")
-    alpha = np.array(img)[:, :, 3]
+    img = Image.open(image_path)
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    # Only the alpha plane is needed; skip copying the RGB channels
+    alpha = np.asarray(img.getchannel("A"))
     binary = alpha > threshold
     print(f"  Image size: {img.size}, Stroke pixels: {binary.sum()}")
     return binary
@@ -269,47 +340,187 @@ def extract_skeleton(binary):
     return skeleton
 
 
+def _remove_pixel(skeleton, px, nbr_count, endpoints, junctions):
+    """Delete one skeleton pixel and patch the neighbor counts and the
+    endpoint/junction sets of its 8 neighbors."""
+    skeleton[px] = False
+    endpoints.discard(px)
+    junctions.discard(px)
+    for nb in get_8_neighbors(skeleton, px[0], px[1]):
+        nbr_count[nb] -= 1
+        n = nbr_count[nb]
+        if n == 1:
+            endpoints.add(nb)
+        else:
+            endpoints.discard(nb)
+        if n < 3:
+            junctions.discard(nb)
+
+
+def _prune_pass_py(skeleton, min_length, nbr_count, endpoints, junctions):
+    """One pruning pass: remove endpoint branches shorter than min_length
+    pixels (in place).  nbr_count, endpoints and junctions describe the
+    current skeleton and are kept up to date as pixels are removed, so
+    passes do not rescan the image.  Returns True if any pixel was
+    removed."""
+    changed = False
+    # Walk endpoints in row-major order and test against the junctions
+    # as they were at the start of the pass
+    junction_set = set(junctions)
+    for ep in sorted(endpoints):
+        branch = [ep]
+        current = ep
+        visited = {ep}
+        while True:
+            nbrs = [n for n in get_8_neighbors(skeleton, current[0], current[1]) if n not in visited]
+            if not nbrs:
+                break
+            if len(nbrs) == 1:
+                nxt = nbrs[0]
+                branch.append(nxt)
+                visited.add(nxt)
+                if nxt in junction_set:
+                    if len(branch) < min_length:
+                        for px in branch[:-1]:
+                            _remove_pixel(skeleton, px, nbr_count, endpoints, junctions)
+                        changed = True
+                    break
+                current = nxt
+            else:
+                if len(branch) < min_length:
+                    for px in branch[:-1]:
+                        _remove_pixel(skeleton, px, nbr_count, endpoints, junctions)
+                    changed = True
+                break
+    return changed
+
+
+def _prune_pass_kernel(skeleton, min_length):
+    """Array-only port of _prune_pass_py, compiled with Numba when it is
+    installed.  Same pixel order and removal rules; per-branch visited
+    pixels are tracked in a bool mask and reset after each walk."""
+    h, w = skeleton.shape
+    junction = np.zeros((h, w), dtype=np.bool_)
+    n_pixels = 0
+    n_endpoints = 0
+    for r in range(h):
+        for c in range(w):
+            if skeleton[r, c]:
+                n_pixels += 1
+                n = 0
+                for dr in range(-1, 2):
+                    for dc in range(-1, 2):
+                        nr = r + dr
+                        nc = c + dc
+                        if (dr != 0 or dc != 0) and 0 <= nr < h and 0 <= nc < w and skeleton[nr, nc]:
+                            n += 1
+                if n == 1:
+                    n_endpoints += 1
+                elif n >= 3:
+                    junction[r, c] = True
+    endpoints = np.empty((n_endpoints, 2), dtype=np.int64)
+    k = 0
+    for r in range(h):
+        for c in range(w):
+            if skeleton[r, c]:
+                n = 0
+                for dr in range(-1, 2):
+                    for dc in range(-1, 2):
+                        nr = r + dr
+                        nc = c + dc
+                        if (dr != 0 or dc != 0) and 0 <= nr < h and 0 <= nc < w and skeleton[nr, nc]:
+                            n += 1
+                if n == 1:
+                    endpoints[k, 0] = r
+                    endpoints[k, 1] = c
+                    k += 1
+
+    changed = False
+    visited = np.zeros((h, w), dtype=np.bool_)
+    branch = np.empty((n_pixels + 1, 2), dtype=np.int64)
+    for k in range(n_endpoints):
+        cr = endpoints[k, 0]
+        cc = endpoints[k, 1]
+        branch[0, 0] = cr
+        branch[0, 1] = cc
+        blen = 1
+        visited[cr, cc] = True
+        while True:
+            count = 0
+            nxt_r = -1
+            nxt_c = -1
+            for dr in range(-1, 2):
+                for dc in range(-1, 2):
+                    nr = cr + dr
+                    nc = cc + dc
+                    if ((dr != 0 or dc != 0) and 0 <= nr < h and 0 <= nc < w
+                            and skeleton[nr, nc] and not visited[nr, nc]):
+                        count += 1
+                        nxt_r = nr
+                        nxt_c = nc
+            if count == 0:
+                break
+            if count == 1:
+                branch[blen, 0] = nxt_r
+                branch[blen, 1] = nxt_c
+                blen += 1
+                visited[nxt_r, nxt_c] = True
+                if junction[nxt_r, nxt_c]:
+                    if blen < min_length:
+                        for i in range(blen - 1):
+                            skeleton[branch[i, 0], branch[i, 1]] = False
+                        changed = True
+                    break
+                cr = nxt_r
+                cc = nxt_c
+            else:
+                if blen < min_length:
+                    for i in range(blen - 1):
+                        skeleton[branch[i, 0], branch[i, 1]] = False
+                    changed = True
+                break
+        for i in range(blen):
+            visited[branch[i, 0], branch[i, 1]] = False
+    return changed
+
+
+_prune_pass_jit = None
+
+
+def _select_jit_prune_pass(n_pixels):
+    """Return the Numba-compiled pruning pass for a skeleton of n_pixels
+    pixels, or None to use the pure-Python pass.  Numba's import and
+    compile (~1 s cold, ~0.15 s from cache) only pays off on large
+    skeletons; the logo's ~2k-pixel skeleton prunes in ~20 ms in pure
+    Python."""
+    global _prune_pass_jit
+    if n_pixels < NUMBA_MIN_PIXELS:
+        return None
+    if _prune_pass_jit is None:
+        try:
+            from numba import njit
+        except ImportError:
+            return None
+        _prune_pass_jit = njit(cache=True)(_prune_pass_kernel)
+    return _prune_pass_jit
+
+
 def prune_short_branches(skeleton, min_length=PRUNE_MIN_LENGTH):
-    skeleton = skeleton.copy()
+    skeleton = np.ascontiguousarray(skeleton, dtype=np.bool_).copy()
+    jit_pass = _select_jit_prune_pass(int(skeleton.sum()))
+    if jit_pass is None:
+        # Classify once; passes update the counts incrementally
+        nbr_count = neighbor_count_map(skeleton)
+        endpoints = {tuple(p) for p in np.argwhere(skeleton & (nbr_count == 1)).tolist()}
+        junctions = {tuple(p) for p in np.argwhere(skeleton & (nbr_count >= 3)).tolist()}
     changed = True
     iterations = 0
     while changed and iterations < 50:
-        changed = False
         iterations += 1
-        coords = np.argwhere(skeleton)
-        junction_set = set()
-        endpoints = []
-        for r, c in coords:
-            n = len(get_8_neighbors(skeleton, r, c))
-            if n == 1:
-                endpoints.append((r, c))
-            elif n >= 3:
-                junction_set.add((r, c))
-        for ep in endpoints:
-            branch = [ep]
-            current = ep
-            visited = {ep}
-            while True:
-                nbrs = [n for n in get_8_neighbors(skeleton, current[0], current[1]) if n not in visited]
-                if not nbrs:
-                    break
-                if len(nbrs) == 1:
-                    nxt = nbrs[0]
-                    branch.append(nxt)
-                    visited.add(nxt)
-                    if nxt in junction_set:
-                        if len(branch) < min_length:
-                            for px in branch[:-1]:
-                                skeleton[px[0], px[1]] = False
-                            changed = True
-                        break
-                    current = nxt
-                else:
-                    if len(branch) < min_length:
-                        for px in branch[:-1]:
-                            skeleton[px[0], px[1]] = False
-                        changed = True
-                    break
+        if jit_pass is None:
+            changed = _prune_pass_py(skeleton, min_length, nbr_count, endpoints, junctions)
+        else:
+            changed = jit_pass(skeleton, min_length)
     print(f"  After pruning: {skeleton.sum()} pixels")
     return skeleton
 
@@ -325,110 +536,112 @@ def decompose_skeleton(skeleton):
         segments: list of ordered pixel lists, each connecting two
                   junctions or a junction and an endpoint
     """
-    coords = np.argwhere(skeleton)
-
     # Find junctions and endpoints
-    junctions = set()
-    endpoints = set()
-    for r, c in coords:
-        n = len(get_8_neighbors(skeleton, r, c))
-        if n >= 3:
-            junctions.add((int(r), int(c)))
-        elif n == 1:
-            endpoints.add((int(r), int(c)))
+    nbr_count = neighbor_count_map(skeleton)
+    junctions = {tuple(p) for p in np.argwhere(skeleton & (nbr_count >= 3)).tolist()}
+    endpoints = {tuple(p) for p in np.argwhere(skeleton & (nbr_count == 1)).tolist()}
 
     print(f"  Junctions: {len(junctions)}, Endpoints: {len(endpoints)}")
 
+    # Adjacency of every skeleton pixel, read from the mask once.  Pixels
+    # are keyed by their linear index r*W + c so the walks below hash and
+    # compare plain ints; coordinates are decoded only for the output.
+    W = skeleton.shape[1]
+    adj = {r * W + c: tuple(nr * W + nc for nr, nc in get_8_neighbors(skeleton, r, c))
+           for r, c in np.argwhere(skeleton).tolist()}
+
     # Cluster nearby junctions (within 8px) into junction groups
     # 8px is needed because the e-crossing junctions span ~6px
+    # (single linkage on Chebyshev distance: pairs from a KD-tree, clusters
+    # from connected components, numbered in sorted-junction order)
     junction_list = sorted(junctions)
     junction_clusters = []  # list of sets
-    assigned = {}  # pixel -> cluster_id
-
-    for jp in junction_list:
-        # Check if close to an existing cluster
-        merged = False
-        for ci, cluster in enumerate(junction_clusters):
-            for cp in cluster:
-                if abs(jp[0] - cp[0]) <= 8 and abs(jp[1] - cp[1]) <= 8:
-                    cluster.add(jp)
-                    assigned[jp] = ci
-                    merged = True
-                    break
-            if merged:
-                break
-        if not merged:
-            assigned[jp] = len(junction_clusters)
-            junction_clusters.append({jp})
+    if junction_list:
+        pairs = cKDTree(junction_list).query_pairs(8, p=np.inf, output_type='ndarray')
+        n_j = len(junction_list)
+        adjacency = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n_j, n_j))
+        n_clusters, labels = connected_components(adjacency, directed=False)
+        junction_clusters = [set() for _ in range(n_clusters)]
+        for jp, ci in zip(junction_list, labels.tolist()):
+            junction_clusters[ci].add(jp)
 
     # Add non-junction skeleton pixels between clustered junctions to the cluster
     # (pixels with 2 neighbors that are between two junction pixels)
+    # Each step is a conditional dilation: convolving the cluster mask
+    # counts cluster neighbors for every pixel at once.  Work in a window
+    # around the cluster that is wide enough for 5 steps of growth.
+    growable = skeleton.copy()
+    for ep in endpoints:
+        growable[ep] = False
+    h, w = skeleton.shape
     for ci, cluster in enumerate(junction_clusters):
+        rows = [p[0] for p in cluster]
+        cols = [p[1] for p in cluster]
+        r0, r1 = max(min(rows) - 6, 0), min(max(rows) + 7, h)
+        c0, c1 = max(min(cols) - 6, 0), min(max(cols) + 7, w)
+        window = growable[r0:r1, c0:c1]
+        in_cluster = np.zeros(window.shape, dtype=bool)
+        in_cluster[np.array(rows) - r0, np.array(cols) - c0] = True
         expanded = set(cluster)
         for _ in range(5):  # expand a few times
-            new_pixels = set()
-            for px in expanded:
-                for nbr in get_8_neighbors(skeleton, px[0], px[1]):
-                    nb = (int(nbr[0]), int(nbr[1]))
-                    if nb not in expanded and nb not in endpoints:
-                        # Check if this pixel is "between" two cluster pixels
-                        nbr_nbrs = get_8_neighbors(skeleton, nb[0], nb[1])
-                        in_cluster = sum(1 for nn in nbr_nbrs if (int(nn[0]), int(nn[1])) in expanded)
-                        if in_cluster >= 2:
-                            new_pixels.add(nb)
-            if not new_pixels:
+            # Pixels "between" two or more cluster pixels join the cluster
+            cluster_nbrs = convolve(in_cluster.astype(np.uint8), _NEIGHBOR_KERNEL, mode='constant', cval=0)
+            new_pixels = window & ~in_cluster & (cluster_nbrs >= 2)
+            if not new_pixels.any():
                 break
-            expanded |= new_pixels
+            in_cluster |= new_pixels
+            expanded.update((r + r0, c + c0) for r, c in np.argwhere(new_pixels).tolist())
         junction_clusters[ci] = expanded
 
     # Build a set of all junction-zone pixels
+    # (plus a flat mask and cluster-id array indexed by linear pixel index)
     junction_zone = set()
-    pixel_to_cluster = {}
+    in_zone = bytearray(skeleton.size)
+    pixel_to_cluster = np.full(skeleton.size, -1, dtype=np.int32)
     for ci, cluster in enumerate(junction_clusters):
         for px in cluster:
             junction_zone.add(px)
-            pixel_to_cluster[px] = ci
+            in_zone[px[0] * W + px[1]] = 1
+            pixel_to_cluster[px[0] * W + px[1]] = ci
 
     print(f"  Junction clusters: {len(junction_clusters)}")
-    for ci, cluster in enumerate(junction_clusters):
-        center = (sum(p[0] for p in cluster) / len(cluster),
-                  sum(p[1] for p in cluster) / len(cluster))
-        print(f"    Cluster {ci}: {len(cluster)} pixels, center ~({center[0]:.0f},{center[1]:.0f})")
+    if VERBOSE:
+        for ci, cluster in enumerate(junction_clusters):
+            center = (sum(p[0] for p in cluster) / len(cluster),
+                      sum(p[1] for p in cluster) / len(cluster))
+            print(f"    Cluster {ci}: {len(cluster)} pixels, center ~({center[0]:.0f},{center[1]:.0f})")
 
     # Walk segments: start from each junction-zone boundary pixel and walk
     # until hitting another junction zone or endpoint
     segments = []
-    walked = set()  # track walked non-junction pixels
+    walked = bytearray(skeleton.size)  # track walked non-junction pixels
 
     # Find all "exit points" from each junction zone - pixels just outside
     # the zone that are neighbors of zone pixels
     exit_points = []
     for px in junction_zone:
-        for nbr in get_8_neighbors(skeleton, px[0], px[1]):
-            nb = (int(nbr[0]), int(nbr[1]))
-            if nb not in junction_zone:
+        ci = int(pixel_to_cluster[px[0] * W + px[1]])
+        for nb in adj[px[0] * W + px[1]]:
+            if not in_zone[nb]:
                 # nb is an exit point from this junction zone
-                ci = pixel_to_cluster.get(px, -1)
                 exit_points.append((nb, ci, px))  # (exit_pixel, cluster_id, zone_pixel)
 
     # Also start from endpoints
     for ep in endpoints:
-        exit_points.append((ep, -1, None))
+        exit_points.append((ep[0] * W + ep[1], -1, None))
 
     for start_px, start_cluster, zone_px in exit_points:
-        if start_px in walked:
+        if walked[start_px]:
             continue
 
         # Walk from start_px
         seg = [start_px]
-        walked.add(start_px)
+        walked[start_px] = 1
         current = start_px
 
         while True:
-            nbrs = get_8_neighbors(skeleton, current[0], current[1])
-            candidates = [(int(n[0]), int(n[1])) for n in nbrs
-                         if (int(n[0]), int(n[1])) not in walked and
-                            (int(n[0]), int(n[1])) not in junction_zone]
+            candidates = [n for n in adj[current]
+                          if not walked[n] and not in_zone[n]]
 
             if not candidates:
                 # Check if we've reached a junction zone or endpoint
@@ -439,22 +652,24 @@ def decompose_skeleton(skeleton):
             else:
                 # At a fork outside junction zone - shouldn't happen after pruning
                 # Pick the one most aligned with current direction
+                cur_r, cur_c = divmod(current, W)
                 if len(seg) >= 2:
-                    tang = (seg[-1][0] - seg[-2][0], seg[-1][1] - seg[-2][1])
+                    prev_r, prev_c = divmod(seg[-2], W)
+                    tang = (cur_r - prev_r, cur_c - prev_c)
                 else:
                     tang = (0, 0)
                 best = candidates[0]
                 best_dot = -999
                 for c in candidates:
-                    d = (c[0] - current[0], c[1] - current[1])
-                    dot = d[0] * tang[0] + d[1] * tang[1]
+                    c_r, c_c = divmod(c, W)
+                    dot = (c_r - cur_r) * tang[0] + (c_c - cur_c) * tang[1]
                     if dot > best_dot:
                         best_dot = dot
                         best = c
                 nxt = best
 
             seg.append(nxt)
-            walked.add(nxt)
+            walked[nxt] = 1
             current = nxt
 
         # Determine what this segment connects to at each end
@@ -462,16 +677,17 @@ def decompose_skeleton(skeleton):
         # End end: check neighbors of current for junction zone pixels
         end_cluster = -1
         end_zone_px = None
-        for nbr in get_8_neighbors(skeleton, current[0], current[1]):
-            nb = (int(nbr[0]), int(nbr[1]))
-            if nb in junction_zone:
-                end_cluster = pixel_to_cluster.get(nb, -1)
-                end_zone_px = nb
+        for nb in adj[current]:
+            if in_zone[nb]:
+                end_cluster = int(pixel_to_cluster[nb])
+                end_zone_px = divmod(nb, W)
                 break
 
+        seg = [divmod(i, W) for i in seg]
+
         # Also check if current is an endpoint
-        is_start_ep = start_px in endpoints
-        is_end_ep = current in endpoints
+        is_start_ep = seg[0] in endpoints
+        is_end_ep = seg[-1] in endpoints
 
         if len(seg) >= 2:  # Only keep meaningful segments
             segments.append({
@@ -486,10 +702,11 @@ def decompose_skeleton(skeleton):
             })
 
     print(f"\n  Segments found: {len(segments)}")
-    for i, s in enumerate(segments):
-        print(f"    Seg {i}: {s['length']:4d} px, "
-              f"cluster {s['start_cluster']} ({s['start']}) -> "
-              f"cluster {s['end_cluster']} ({s['end']})")
+    if VERBOSE:
+        for i, s in enumerate(segments):
+            print(f"    Seg {i}: {s['length']:4d} px, "
+                  f"cluster {s['start_cluster']} ({s['start']}) -> "
+                  f"cluster {s['end_cluster']} ({s['end']})")
 
     return junction_clusters, segments, endpoints
 
@@ -530,12 +747,13 @@ def build_path_from_segments(junction_clusters, segments, endpoints):
         else:
             cluster_names[ci] = f'unknown_{ci}'
 
-    print("\n  Cluster identification:")
-    for ci, name in sorted(cluster_names.items()):
-        cluster = junction_clusters[ci]
-        center_r = sum(p[0] for p in cluster) / len(cluster)
-        center_c = sum(p[1] for p in cluster) / len(cluster)
-        print(f"    Cluster {ci} ({name}): center ({center_r:.0f},{center_c:.0f})")
+    if VERBOSE:
+        print("\n  Cluster identification:")
+        for ci, name in sorted(cluster_names.items()):
+            cluster = junction_clusters[ci]
+            center_r = sum(p[0] for p in cluster) / len(cluster)
+            center_c = sum(p[1] for p in cluster) / len(cluster)
+            print(f"    Cluster {ci} ({name}): center ({center_r:.0f},{center_c:.0f})")
 
     # Build a lookup: for each (start_cluster, end_cluster), list matching segments
     seg_lookup = {}
@@ -550,11 +768,12 @@ def build_path_from_segments(junction_clusters, segments, endpoints):
         seg_lookup.setdefault(key, []).append((i, False))  # (seg_index, reversed)
         seg_lookup.setdefault(rev_key, []).append((i, True))
 
-    print("\n  Segment connectivity:")
-    for key, segs in sorted(seg_lookup.items()):
-        for si, rev in segs:
-            s = segments[si]
-            print(f"    {key[0]} -> {key[1]}: seg {si} ({s['length']} px){' (rev)' if rev else ''}")
+    if VERBOSE:
+        print("\n  Segment connectivity:")
+        for key, segs in sorted(seg_lookup.items()):
+            for si, rev in segs:
+                s = segments[si]
+                print(f"    {key[0]} -> {key[1]}: seg {si} ({s['length']} px){' (rev)' if rev else ''}")
 
     # Now define the stroke order based on actual segment connectivity:
     # EP(707,425) -> asc_bot -> asc_top -> [loop] -> asc_top -> asc_bot
@@ -635,17 +854,16 @@ def build_path_from_segments(junction_clusters, segments, endpoints):
                 t1r, t1c = t1r / mag1 * dist, t1c / mag1 * dist
                 # Sample the Hermite curve (1.5x gap distance for denser sampling)
                 num_steps = max(3, int(round(dist * 1.5)))
-                bridge = []
-                for k in range(1, num_steps):
-                    t = k / num_steps
-                    t2, t3 = t * t, t * t * t
-                    h00 = 2*t3 - 3*t2 + 1
-                    h10 = t3 - 2*t2 + t
-                    h01 = -2*t3 + 3*t2
-                    h11 = t3 - t2
-                    br = h00*last[0] + h10*t0r + h01*first[0] + h11*t1r
-                    bc = h00*last[1] + h10*t0c + h01*first[1] + h11*t1c
-                    bridge.append((int(round(br)), int(round(bc))))
+                t = np.arange(1, num_steps) / num_steps
+                t2, t3 = t * t, t * t * t
+                h00 = 2*t3 - 3*t2 + 1
+                h10 = t3 - 2*t2 + t
+                h01 = -2*t3 + 3*t2
+                h11 = t3 - t2
+                br = h00*last[0] + h10*t0r + h01*first[0] + h11*t1r
+                bc = h00*last[1] + h10*t0c + h01*first[1] + h11*t1c
+                # np.rint rounds half to even, like round()
+                bridge = [tuple(p) for p in np.rint(np.stack([br, bc], axis=1)).astype(np.int64).tolist()]
                 seam_center = len(full_path) + len(bridge) // 2
                 junction_seam_indices.append(seam_center)
                 full_path.extend(bridge)
@@ -653,18 +871,20 @@ def build_path_from_segments(junction_clusters, segments, endpoints):
         else:
             full_path.extend(pixels)
 
-        print(f"  Step {step_i}: {from_name} -> {to_name}: seg {si} "
-              f"({seg['length']} px, {'rev' if rev else 'fwd'}, "
-              f"use #{seg_usage[si]}), path now {len(full_path)} px")
+        if VERBOSE:
+            print(f"  Step {step_i}: {from_name} -> {to_name}: seg {si} "
+                  f"({seg['length']} px, {'rev' if rev else 'fwd'}, "
+                  f"use #{seg_usage[si]}), path now {len(full_path)} px")
 
     unused = [i for i in range(len(segments)) if seg_usage.get(i, 0) == 0]
     if unused:
         print(f"\n  Unused segments: {unused}")
-        for i in unused:
-            s = segments[i]
-            sc_name = cluster_names.get(s['start_cluster'], s['start_cluster'])
-            ec_name = cluster_names.get(s['end_cluster'], s['end_cluster'])
-            print(f"    Seg {i}: {sc_name} -> {ec_name}, {s['length']} px")
+        if VERBOSE:
+            for i in unused:
+                s = segments[i]
+                sc_name = cluster_names.get(s['start_cluster'], s['start_cluster'])
+                ec_name = cluster_names.get(s['end_cluster'], s['end_cluster'])
+                print(f"    Seg {i}: {sc_name} -> {ec_name}, {s['length']} px")
 
     print(f"\n  Total path: {len(full_path)} pixels")
     print(f"  Junction seam indices: {junction_seam_indices}")
@@ -674,76 +894,150 @@ def build_path_from_segments(junction_clusters, segments, endpoints):
 # ---------------------------------------------------------------------------
 # Smoothing and bezier conversion
 # ---------------------------------------------------------------------------
-def smooth_and_simplify(ordered, junction_seam_indices=None, sigma=GAUSSIAN_SIGMA, epsilon=RDP_EPSILON):
+def smooth_and_simplify(ordered, junction_seam_indices=None, sigma=GAUSSIAN_SIGMA, epsilon=RDP_EPSILON,
+                        path_epsilon=PATH_RDP_EPSILON):
     pts = np.array(ordered, dtype=float)
     # First pass: global Gaussian smoothing
-    pts[:, 0] = gaussian_filter1d(pts[:, 0], sigma=sigma)
-    pts[:, 1] = gaussian_filter1d(pts[:, 1], sigma=sigma)
+    pts = gaussian_smooth(pts, sigma)
     # Second pass: targeted extra smoothing at junction seams
     if junction_seam_indices:
         JUNC_SIGMA = 18
         JUNC_WINDOW = 50
+        windows = []
         for idx in junction_seam_indices:
             lo = max(0, idx - JUNC_WINDOW)
             hi = min(len(pts), idx + JUNC_WINDOW + 1)
-            if hi - lo < 5:
-                continue
-            pts[lo:hi, 0] = gaussian_filter1d(pts[lo:hi, 0], sigma=JUNC_SIGMA)
-            pts[lo:hi, 1] = gaussian_filter1d(pts[lo:hi, 1], sigma=JUNC_SIGMA)
+            if hi - lo >= 5:
+                windows.append((lo, hi))
+        # Seams are smoothed in order and overlapping windows see earlier
+        # results, so group windows into levels: a window goes one level
+        # after every earlier window it overlaps.  Windows within a level
+        # are disjoint, and full-size ones are filtered in a single call.
+        levels = []
+        for k, (lo, hi) in enumerate(windows):
+            levels.append(1 + max((levels[j] for j in range(k)
+                                   if windows[j][0] < hi and lo < windows[j][1]), default=-1))
+        full_size = 2 * JUNC_WINDOW + 1
+        for level in range(max(levels, default=-1) + 1):
+            group = [w for w, lv in zip(windows, levels) if lv == level]
+            full = [np.arange(lo, hi) for lo, hi in group if hi - lo == full_size]
+            if full:
+                rows = np.stack(full)
+                pts[rows] = gaussian_smooth(pts[rows], JUNC_SIGMA, axis=1)
+            for lo, hi in group:
+                if hi - lo != full_size:
+                    pts[lo:hi] = gaussian_smooth(pts[lo:hi], JUNC_SIGMA)
         print(f"  Applied targeted smoothing at {len(junction_seam_indices)} junction seams")
-    xy = [(float(p[1]), float(p[0])) for p in pts]
+    # (row, col) -> contiguous (x, y) array, handed to RDP without a list
+    xy = np.ascontiguousarray(pts[:, ::-1])
     simplified = rdp_simplify(xy, epsilon)
     print(f"  RDP simplified to {len(simplified)} points")
     # Chaikin corner-cutting to smooth angular artifacts left by RDP
     smoothed = chaikin_subdivide(simplified, iterations=2)
     print(f"  After Chaikin subdivision: {len(smoothed)} points")
     smoothed = compress_ascender_loop(smoothed, target_gap_svg=ASCENDER_LOOP_TARGET_GAP)
+    # Chaikin leaves many nearly collinear points; a fine RDP pass drops
+    # them so fewer cubics are emitted (the spline moves < ~1.5 px here).
+    # At this tolerance pybind11-rdp can break near-ties differently, so
+    # always use the NumPy version to keep the SVG independent of it.
+    if path_epsilon > 0:
+        smoothed = np.array(_rdp_simplify_np(smoothed, path_epsilon))
+        print(f"  Path RDP simplified to {len(smoothed)} points")
+    # Stays an (N, 2) array through scaling and path generation
     return smoothed
 
 
-def catmull_rom_to_bezier(p0, p1, p2, p3, alpha=CATMULL_ROM_ALPHA):
-    def tj(ti, pi, pj):
-        d = ((pj[0]-pi[0])**2 + (pj[1]-pi[1])**2) ** 0.5
-        return ti + d ** alpha
-    t0 = 0
-    t1 = tj(t0, p0, p1)
-    t2 = tj(t1, p1, p2)
-    t3 = tj(t2, p2, p3)
-    if abs(t1-t0)<1e-10 or abs(t2-t1)<1e-10 or abs(t3-t2)<1e-10:
-        return p1, p2
-    d1x = (p1[0]-p0[0])/(t1-t0) - (p2[0]-p0[0])/(t2-t0) + (p2[0]-p1[0])/(t2-t1)
-    d1y = (p1[1]-p0[1])/(t1-t0) - (p2[1]-p0[1])/(t2-t0) + (p2[1]-p1[1])/(t2-t1)
-    d2x = (p2[0]-p1[0])/(t2-t1) - (p3[0]-p1[0])/(t3-t1) + (p3[0]-p2[0])/(t3-t2)
-    d2y = (p2[1]-p1[1])/(t2-t1) - (p3[1]-p1[1])/(t3-t1) + (p3[1]-p2[1])/(t3-t2)
-    sl = t2 - t1
-    return (p1[0]+d1x*sl/3, p1[1]+d1y*sl/3), (p2[0]-d2x*sl/3, p2[1]-d2y*sl/3)
+def catmull_rom_to_bezier(points, alpha=CATMULL_ROM_ALPHA):
+    """Cubic Bezier control points for every span of a Catmull-Rom spline.
+
+    Span i runs from points[i+1] to points[i+2], with points[i] and
+    points[i+3] as its outer neighbors.  Spans with coincident knots fall
+    back to their own endpoints as control points (a straight line).
+
+    Args:
+        points: (M, 2) array or list of (x, y) points, M >= 4.
+        alpha: knot parameterization (0.5 = centripetal).
+
+    Returns:
+        (cp1, cp2): two (M-3, 2) float64 arrays.
+    """
+    P = np.asarray(points, dtype=np.float64)
+    delta = np.diff(P, axis=0)
+    d = ((delta[:, 0] ** 2 + delta[:, 1] ** 2) ** 0.5) ** alpha
+    p0, p1, p2, p3 = P[:-3], P[1:-2], P[2:-1], P[3:]
+    t1 = d[:-2, None]
+    t2 = t1 + d[1:-1, None]
+    t3 = t2 + d[2:, None]
+    degenerate = (np.abs(t1) < 1e-10) | (np.abs(t2 - t1) < 1e-10) | (np.abs(t3 - t2) < 1e-10)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (p1 - p0) / t1 - (p2 - p0) / t2 + (p2 - p1) / (t2 - t1)
+        d2 = (p2 - p1) / (t2 - t1) - (p3 - p1) / (t3 - t1) + (p3 - p2) / (t3 - t2)
+        sl = t2 - t1
+        cp1 = np.where(degenerate, p1, p1 + d1 * sl / 3)
+        cp2 = np.where(degenerate, p2, p2 - d2 * sl / 3)
+    return cp1, cp2
+
+
+# Commands after the initial M are written on continuation lines
+_PATH_SEP = "\n           "
+_CUBIC_FMT = _PATH_SEP + "c %.1f %.1f, %.1f %.1f, %.1f %.1f"
+
+
+def _tenths(values):
+    """Round coordinates to the 0.1-unit output grid, as integer tenths."""
+    return np.rint(np.asarray(values) * 10).astype(np.int64)
 
 
 def points_to_svg_path(points):
-    if len(points) < 2:
+    """SVG path data for a centripetal Catmull-Rom spline through points.
+
+    After the absolute M, commands are relative (l / c).  Coordinates are
+    snapped to the 0.1-unit grid before differencing, so the relative
+    offsets add back up to exactly the rounded absolute positions.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    if len(pts) < 2:
         return ""
-    parts = [f"M {points[0][0]:.1f} {points[0][1]:.1f}"]
-    if len(points) == 2:
-        parts.append(f"L {points[1][0]:.1f} {points[1][1]:.1f}")
-        return "\n           ".join(parts)
-    gs = (2*points[0][0]-points[1][0], 2*points[0][1]-points[1][1])
-    ge = (2*points[-1][0]-points[-2][0], 2*points[-1][1]-points[-2][1])
-    ext = [gs] + points + [ge]
-    for i in range(1, len(ext)-2):
-        cp1, cp2 = catmull_rom_to_bezier(ext[i-1], ext[i], ext[i+1], ext[i+2])
-        parts.append(f"C {cp1[0]:.1f} {cp1[1]:.1f}, {cp2[0]:.1f} {cp2[1]:.1f}, {ext[i+1][0]:.1f} {ext[i+1][1]:.1f}")
-    return "\n           ".join(parts)
-
-
-def scale_to_viewbox(points, target_w=TARGET_VB_WIDTH, target_h=TARGET_VB_HEIGHT, padding=PADDING):
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
-    src_w = max_x - min_x
-    src_h = max_y - min_y
+    buf = io.StringIO()
+    write = buf.write
+    start = _tenths(pts[0])
+    write("M %.1f %.1f" % tuple((start / 10).tolist()))
+    if len(pts) == 2:
+        write(_PATH_SEP + "l %.1f %.1f" % tuple(((_tenths(pts[1]) - start) / 10).tolist()))
+        return buf.getvalue()
+    # One row of six numbers per c command (cp1, cp2, end point).  Interior
+    # spans come straight from pts; only the first and last span need a
+    # phantom point mirroring the end segment, so pts is never copied into
+    # a padded array.
+    rows = np.empty((len(pts) - 1, 6))
+    rows[0, :2], rows[0, 2:4] = catmull_rom_to_bezier(np.vstack([2 * pts[0] - pts[1], pts[:3]]))
+    rows[1:-1, :2], rows[1:-1, 2:4] = catmull_rom_to_bezier(pts)
+    rows[-1, :2], rows[-1, 2:4] = catmull_rom_to_bezier(np.vstack([pts[-3:], 2 * pts[-1] - pts[-2]]))
+    rows[:, 4:] = pts[1:]
+    # Each command is relative to the previous command's end point
+    rows = _tenths(rows)
+    current = np.vstack([start, rows[:-1, 4:]])
+    rows -= np.tile(current, 3)
+    for row in (rows / 10).tolist():
+        write(_CUBIC_FMT % tuple(row))
+    return buf.getvalue()
+
+
+def scale_to_viewbox(points, target_w=TARGET_VB_WIDTH, target_h=TARGET_VB_HEIGHT, padding=PADDING,
+                     out=None):
+    """Fit (N, 2) points into the viewBox, centred with padding.  Returns
+    the scaled (N, 2) float64 array and the viewBox string.  The result is
+    written into out when given (it may be points itself), otherwise into
+    one new array."""
+    pts = np.asarray(points, dtype=np.float64)
+    mn = pts.min(axis=0)
+    src_w, src_h = (pts.max(axis=0) - mn).tolist()
     if src_w == 0 or src_h == 0:
-        return points, f"0 0 {target_w} {target_h}"
+        # Degenerate extent: points are returned unscaled (still via out)
+        if out is not None:
+            out[...] = pts
+            return out, f"0 0 {target_w} {target_h}"
+        return pts, f"0 0 {target_w} {target_h}"
     uw = target_w - 2*padding
     uh = target_h - 2*padding
     scale = min(uw/src_w, uh/src_h)
@@ -751,41 +1045,51 @@ def scale_to_viewbox(points, target_w=TARGET_VB_WIDTH, target_h=TARGET_VB_HEIGHT
     sh = src_h * scale
     ox = padding + (uw - sw) / 2
     oy = padding + (uh - sh) / 2
-    scaled = [((x-min_x)*scale+ox, (y-min_y)*scale+oy) for x,y in points]
+    # One buffer, updated in place
+    scaled = np.subtract(pts, mn, out=out)
+    scaled *= scale
+    scaled += (ox, oy)
     vb = f"0 0 {target_w} {target_h}"
-    print(f"  Scale: {scale:.4f}, Offset: ({ox:.1f},{oy:.1f})")
+    if VERBOSE:
+        print(f"  Scale: {scale:.4f}, Offset: ({ox:.1f},{oy:.1f})")
     return scaled, vb
 
 
-def write_svg(path_d, viewbox, output_path, image_path=None):
-    overlay = ""
-    if image_path and os.path.exists(image_path):
-        overlay = f'\n  <image href="{os.path.basename(image_path)}" x="0" y="0" width="241" height="273" opacity="0.25" preserveAspectRatio="xMidYMid meet"/>'
-    svg = f'''<?xml version="1.0" encoding="UTF-8"?>
+# Verification SVG around the path data; only the head varies per call
+_SVG_HEAD = '''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
      viewBox="{viewbox}" width="500" height="500" style="background: #f8f9fa">{overlay}
-  <path d="{path_d}"
+  <path d="'''
+_SVG_IMAGE = ('\n  <image href="{href}" x="0" y="0" width="241" height="273" '
+              'opacity="0.25" preserveAspectRatio="xMidYMid meet"/>')
+_SVG_TAIL = b'''"
         fill="none" stroke="#0f1229" stroke-width="9"
         stroke-linecap="round" stroke-linejoin="round"/>
 </svg>
 '''
-    with open(output_path, 'w') as f:
-        f.write(svg)
-    print(f"  Written: {output_path}")
+
+
+def write_svg(path_d, viewbox, output_path, image_href=None):
+    """Write the verification SVG.  image_href is the (relative) href of
+    the source image drawn faintly behind the path; the caller checks that
+    it exists."""
+    overlay = _SVG_IMAGE.format(href=image_href) if image_href else ""
+    # Written piecewise so the (possibly long) path data is not copied
+    # into one combined document string first
+    with open(output_path, 'wb', buffering=1 << 20) as f:
+        f.write(_SVG_HEAD.format(viewbox=viewbox, overlay=overlay).encode())
+        f.write(path_d.encode())
+        f.write(_SVG_TAIL)
+    if VERBOSE:
+        print(f"  Written: {output_path}")
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    image_path = os.path.join(script_dir, "Submark - No BG.png")
-    svg_output = os.path.join(script_dir, "le-centerline.svg")
-
-    if not os.path.exists(image_path):
-        print(f"ERROR: Cannot find {image_path}")
-        sys.exit(1)
-
+def process_image(image_path, svg_output):
+    """Run the full pipeline on one image and write its verification SVG.
+    Returns (path_d, viewbox)."""
     print("Step 1: Load and binarize")
     binary = load_and_binarize(image_path)
 
@@ -819,10 +1123,35 @@ def main():
     print(f'd="{path_d}"')
 
     print("\nStep 9: Write verification SVG")
-    write_svg(path_d, viewbox, svg_output, image_path)
+    # image_path was checked to exist by main
+    write_svg(path_d, viewbox, svg_output, image_href=os.path.basename(image_path))
     print("\nDone.")
     return path_d, viewbox
 
 
+def main(image_paths=None):
+    """Process the bundled logo, or each given image into
+    <name>-centerline.svg next to it.  Several images are processed in
+    parallel, one worker process per image (their output interleaves)."""
+    if image_paths is None:
+        image_paths = sys.argv[1:]
+    if image_paths:
+        jobs = [(path, os.path.splitext(path)[0] + "-centerline.svg") for path in image_paths]
+    else:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        jobs = [(os.path.join(script_dir, "Submark - No BG.png"),
+                 os.path.join(script_dir, "le-centerline.svg"))]
+
+    for image_path, _ in jobs:
+        if not os.path.exists(image_path):
+            print(f"ERROR: Cannot find {image_path}")
+            sys.exit(1)
+
+    if len(jobs) == 1:
+        return process_image(*jobs[0])
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        return list(pool.map(process_image, *zip(*jobs)))
+
+
 if __name__ == "__main__":
     main()